@@ -0,0 +1,54 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import crud_map, crud_model
+from app.database.session import get_db
+from app.schemas.curriculum import CurriculumCreate, CurriculumResponse, CurriculumListResponse
+from app.services.curriculum import curriculum_runner, CurriculumRun
+
+router = APIRouter()
+
+
+@router.post("/", response_model=CurriculumResponse, status_code=201)
+async def create_curriculum(curriculum: CurriculumCreate, db: AsyncSession = Depends(get_db)):
+    model_schema = await crud_model.get_model_by_model_id(curriculum.model_id, db)
+    stages = []
+    for stage in curriculum.stages:
+        maps = [await crud_map.get_map_by_map_id(map_id, db) for map_id in stage.map_ids]
+        stages.append({
+            "name": stage.name,
+            "map_configs": [m.model_dump() for m in maps],
+            "min_success_rate": stage.min_success_rate,
+        })
+
+    run = curriculum_runner.start(CurriculumRun(
+        user_id=curriculum.user_id or model_schema.model_owner_id,
+        model_config=model_schema.model_dump(),
+        stages=stages,
+        options=curriculum.model_dump(exclude={"model_id", "user_id", "stages"}),
+    ))
+    return CurriculumResponse(type=1401, **run.to_schema().model_dump())
+
+
+@router.get("/", response_model=CurriculumListResponse)
+async def get_curricula(user_id: Optional[str] = None):
+    runs = curriculum_runner.list(user_id)
+    return CurriculumListResponse(type=1400, runs=[run.to_schema() for run in runs])
+
+
+@router.get("/{run_id}", response_model=CurriculumResponse)
+async def get_curriculum(run_id: str):
+    run = curriculum_runner.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Curriculum not found")
+    return CurriculumResponse(type=1402, **run.to_schema().model_dump())
+
+
+@router.post("/{run_id}/cancel", response_model=CurriculumResponse)
+async def cancel_curriculum(run_id: str):
+    run = curriculum_runner.cancel(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Curriculum not found")
+    return CurriculumResponse(type=1404, **run.to_schema().model_dump())
@@ -0,0 +1,27 @@
+import time
+
+from fastapi import APIRouter
+from sqlalchemy import text
+
+from app.database.session import AsyncSessionLocal, pool_metrics
+
+router = APIRouter()
+
+
+@router.get("/db")
+async def get_db_health():
+    """SELECT 1 왕복 시간과 커넥션 풀 상태(빌려 간 커넥션 수, 대기 시간 통계)."""
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e)
+    return {
+        "type": 1500,
+        "ok": ok,
+        "error": error,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "pool": pool_metrics(),
+    }
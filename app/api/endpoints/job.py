@@ -0,0 +1,62 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import crud_map, crud_model
+from app.database.session import get_db
+from app.schemas.job import JobCreate, JobResponse, JobListResponse
+from app.services.job_scheduler import job_scheduler, TrainingJob
+
+router = APIRouter()
+
+
+@router.post("/", response_model=JobResponse, status_code=201)
+async def create_job(job_create: JobCreate, db: AsyncSession = Depends(get_db)):
+    map_schema = await crud_map.get_map_by_map_id(job_create.map_id, db)
+    extra_maps = [await crud_map.get_map_by_map_id(map_id, db) for map_id in job_create.extra_map_ids]
+    model_schema = await crud_model.get_model_by_model_id(job_create.model_id, db)
+    if any(m.solvable is False for m in [map_schema, *extra_maps]):
+        raise HTTPException(status_code=422, detail="Map is not solvable")
+
+    job = job_scheduler.submit(TrainingJob(
+        user_id=job_create.user_id or model_schema.model_owner_id,
+        map_config=map_schema.model_dump(),
+        extra_map_configs=[m.model_dump() for m in extra_maps],
+        model_config=model_schema.model_dump(),
+        loop=not job_create.stop_on_success,
+        telemetry={
+            "mode": job_create.telemetry,
+            "every_n": job_create.telemetry_n,
+            "hz": job_create.telemetry_hz,
+            "render_every": job_create.render_every,
+        },
+        limits={
+            "max_episodes": job_create.max_episodes,
+            "max_successes": job_create.max_successes,
+            "max_seconds": job_create.max_seconds,
+        },
+    ))
+    return JobResponse(type=1301, **job_scheduler.schema(job).model_dump())
+
+
+@router.get("/", response_model=JobListResponse)
+async def get_jobs(user_id: Optional[str] = None):
+    jobs = job_scheduler.list(user_id)
+    return JobListResponse(type=1300, jobs=[job_scheduler.schema(job) for job in jobs])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job = job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(type=1302, **job_scheduler.schema(job).model_dump())
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    job = job_scheduler.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(type=1304, **job_scheduler.schema(job).model_dump())
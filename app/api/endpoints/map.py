@@ -1,78 +1,225 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
 
+from app.api.etag import not_modified, revision_etag, set_etag
+from app.core.config import settings
 from app.crud import crud_map
-from app.schemas.map import MapConfig, MapResponse, MapListResponse
+from app.schemas.map import (
+    MapConfig, MapResponse, MapListResponse, MapSolutionResponse, MapBulkResponse, MapImportResponse,
+)
+from app.services.cache import get_map_solution
+from app.services.map_images import (
+    MULTIPART_OVERHEAD_BYTES, InvalidUpload, UploadTooLarge, make_variants, save_upload, variant_path,
+)
+from app.services.solver import MapTooLarge
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.session import get_db
 import os
-from typing import List
+from typing import List, Literal, Optional
 
 router = APIRouter()
 
 
 @router.post("/", response_model=MapResponse, status_code=201)
-async def create_map(map_config: MapConfig, db: AsyncSession = Depends(get_db)):
-    schema = await crud_map.create_map(map_config, db)
+async def create_map(map_config: MapConfig, allow_unsolvable: bool = False, db: AsyncSession = Depends(get_db)):
+    """풀 수 없는 맵(출구/비트에 도달 불가, max_steps 부족 등)은 allow_unsolvable=true가 아니면 422로 거부합니다."""
+    schema = await crud_map.create_map(map_config, db, allow_unsolvable)
     return MapResponse(type=1101, **schema.model_dump())
 
 
-@router.post("/list", response_model=MapResponse, status_code=201)
-async def create_map_list(map_config_list: List[MapConfig], db: AsyncSession = Depends(get_db)):
-    schemas = []
-    for map_config in map_config_list:
-        schema = await crud_map.create_map(map_config, db)
-        schemas.append(schema.model_dump())
-    return MapListResponse(type=1101, user_id='all', maps=schemas)
-
-
-@router.post("/upload-image/{map_id}", status_code=201)
-async def upload_map_image(map_id: str, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+@router.post("/list", response_model=MapBulkResponse, status_code=201)
+async def create_map_list(map_config_list: List[MapConfig], allow_unsolvable: bool = False, atomic: bool = True,
+                          db: AsyncSession = Depends(get_db)):
+    """
+    여러 맵을 한 트랜잭션(한 번의 커밋)으로 만듭니다.
+    atomic이면 풀 수 없는 맵이 하나라도 있을 때 아무것도 만들지 않고 422, 아니면 그 맵만 건너뛰고 errors에 담습니다.
+    """
+    schemas, errors = await crud_map.create_maps(map_config_list, db, allow_unsolvable, atomic)
+    return MapBulkResponse(type=1101, maps=schemas, errors=errors)
+
+
+async def iter_ndjson_lines(request: Request):
+    """요청 본문을 전부 읽지 않고 줄 단위로 (줄 번호, bytes)를 내보냅니다. 빈 줄은 건너뜁니다."""
+    buffer = b""
+    index = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > settings.MAP_IMPORT_MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Line {index + len(lines)} is too long")
+        for line in lines:
+            if line.strip():
+                yield index, line
+            index += 1
+    if buffer.strip():
+        yield index, buffer
+
+
+@router.post("/import", response_model=MapImportResponse, status_code=201)
+async def import_maps(request: Request, allow_unsolvable: bool = False, atomic: bool = False,
+                      db: AsyncSession = Depends(get_db)):
+    """
+    NDJSON(한 줄에 MapConfig 하나) 본문을 스트리밍으로 읽어 MAP_IMPORT_BATCH개씩 분석해 한 번에 INSERT합니다.
+    atomic이면 모두 한 트랜잭션이고 잘못된 줄이 있으면 아무것도 만들지 않고 422,
+    아니면 배치마다 커밋하며 잘못된 줄은 errors에 담고 건너뜁니다.
+    """
+    map_ids, errors = [], []
+    batch, batch_indexes = [], []
+
+    async def flush():
+        schemas, batch_errors = await crud_map.add_maps(batch, db, allow_unsolvable, atomic, batch_indexes)
+        if atomic:
+            await db.flush()
+        else:
+            await db.commit()
+        map_ids.extend(schema.map_id for schema in schemas)
+        errors.extend(batch_errors)
+        batch.clear()
+        batch_indexes.clear()
+
+    try:
+        async for index, line in iter_ndjson_lines(request):
+            try:
+                map_config = MapConfig.model_validate_json(line)
+            except ValidationError as e:
+                if atomic:
+                    raise HTTPException(status_code=422, detail={"index": index, "message": str(e)})
+                errors.append({"index": index, "detail": str(e)})
+                continue
+            batch.append(map_config)
+            batch_indexes.append(index)
+            if len(batch) >= settings.MAP_IMPORT_BATCH:
+                await flush()
+        if batch:
+            await flush()
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    errors.sort(key=lambda error: error["index"])
+    return MapImportResponse(type=1107, created=len(map_ids), map_ids=map_ids, errors=errors)
+
+
+@router.post("/upload-image/{map_id}", status_code=201, openapi_extra={"requestBody": {"required": True, "content": {
+    "multipart/form-data": {"schema": {"type": "object", "required": ["file"],
+                                       "properties": {"file": {"type": "string", "format": "binary"}}}}}}})
+async def upload_map_image(map_id: str, request: Request, background_tasks: BackgroundTasks,
+                           db: AsyncSession = Depends(get_db)):
+    """
+    multipart/form-data의 file 파트를 받는 대로 임시 파일에 쓴 뒤 map_url로 rename하고,
+    WebP/썸네일 변환본은 응답 후 백그라운드에서 만듭니다.
+    UploadFile을 쓰지 않고 본문을 직접 읽으므로, MAP_IMAGE_MAX_BYTES를 넘으면 전부 받기 전에 413 입니다.
+    """
+    content_length = request.headers.get("content-length")
+    try:
+        content_length = None if content_length is None else int(content_length)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+    # multipart 경계 등 여유분을 두고, 분명히 큰 요청은 읽기 전에 거절
+    if content_length is not None and content_length > settings.MAP_IMAGE_MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.MAP_IMAGE_MAX_BYTES} bytes")
     existing_map = await crud_map.get_map_by_map_id(map_id, db)
     if not existing_map:
         raise HTTPException(status_code=404, detail="Map not found")
 
     file_location = existing_map.map_url
-    with open(file_location, "wb") as buffer:
-        buffer.write(await file.read())
-
-    return {"type": 1105, "map_id": map_id, "file_location": file_location}
+    try:
+        size = await save_upload(request.stream(), request.headers.get("content-type", ""), file_location,
+                                 settings.MAP_IMAGE_MAX_BYTES, settings.MAP_IMAGE_CHUNK_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    background_tasks.add_task(make_variants, file_location)
+
+    return {"type": 1105, "map_id": map_id, "file_location": file_location, "size": size}
+
+
+@router.get("/{map_id}/image", responses={304: {"description": "Not Modified"}})
+async def get_map_image(map_id: str, request: Request, variant: Literal["original", "webp", "thumb"] = "original",
+                        db: AsyncSession = Depends(get_db)):
+    """
+    업로드한 맵 이미지 또는 변환본을 캐시 헤더와 함께 반환합니다.
+    변환본은 업로드 직후 만들어지는 중이거나 Pillow가 없는 서버에서는 404 입니다.
+    """
+    schema = await crud_map.get_map_by_map_id(map_id, db)
+    if not schema:
+        raise HTTPException(status_code=404, detail="Map not found")
+    path = schema.map_url if variant == "original" else variant_path(schema.map_url, variant)
+    try:
+        stat = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    media_type = "image/png" if variant == "original" else "image/webp"
+    return FileResponse(path, media_type=media_type, stat_result=stat, headers={
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MAP_IMAGE_MAX_AGE}",
+    })
 
 
 @router.get("/", response_model=MapListResponse)
-async def get_all_maps(db: AsyncSession = Depends(get_db)):
-    schemas = await crud_map.get_all_maps(db)
-    return MapListResponse(
-        type=1100,
-        user_id="all",
-        maps=[m for m in schemas]
-    )
+async def get_all_maps(limit: Optional[int] = Query(None, ge=1, le=1000), cursor: Optional[str] = None,
+                       summary: bool = False, db: AsyncSession = Depends(get_db)):
+    """limit를 주면 한 페이지씩 반환하고, 다음 페이지는 next_cursor를 cursor로 넘겨 요청합니다."""
+    schemas, next_cursor = await crud_map.get_maps(db, limit=limit, cursor=cursor, summary=summary)
+    return MapListResponse(type=1100, user_id="all", maps=schemas, next_cursor=next_cursor)
 
 
 @router.get("/user/{user_id}", response_model=MapListResponse)
-async def get_maps_by_user(user_id: str, db: AsyncSession = Depends(get_db)):
-    schemas = await crud_map.get_all_maps(db)
-    return MapListResponse(
-        type=1100,
-        user_id=user_id,
-        maps=[m.model_dump() for m in schemas if m.map_owner_id == user_id]
-    )
+async def get_maps_by_user(user_id: str, limit: Optional[int] = Query(None, ge=1, le=1000),
+                           cursor: Optional[str] = None, summary: bool = False,
+                           db: AsyncSession = Depends(get_db)):
+    schemas, next_cursor = await crud_map.get_maps(db, owner_id=user_id, limit=limit, cursor=cursor,
+                                                   summary=summary)
+    return MapListResponse(type=1100, user_id=user_id, maps=schemas, next_cursor=next_cursor)
 
 
-@router.get("/{map_id}", response_model=MapResponse)
-async def get_map_by_map_id(map_id: str, db: AsyncSession = Depends(get_db)):
+@router.get("/{map_id}", response_model=MapResponse, responses={304: {"description": "Not Modified"}})
+async def get_map_by_map_id(map_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """ETag는 맵의 revision 기준이며, If-None-Match가 일치하면 본문 없이 304를 반환합니다."""
     schema = await crud_map.get_map_by_map_id(map_id, db)
     if not schema:
         raise HTTPException(status_code=404, detail="Map not found")
+    etag = revision_etag(map_id, schema.revision)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    set_etag(response, etag)
     return MapResponse(type=1102, **schema.model_dump())
 
 
+@router.get("/{map_id}/solution", response_model=MapSolutionResponse)
+async def get_map_solution_by_map_id(map_id: str, db: AsyncSession = Depends(get_db)):
+    """상태 공간 전체를 풀어 최소 스텝 수, 최적 보상, 최적 행동 목록을 반환합니다."""
+    schema = await crud_map.get_map_by_map_id(map_id, db)
+    if not schema:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    def solve():
+        solution = get_map_solution(schema.model_dump())
+        return solution.optimal_actions(), solution.summary()
+
+    try:
+        optimal_actions, summary = await run_in_threadpool(solve)
+    except MapTooLarge as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return MapSolutionResponse(type=1106, map_id=map_id, optimal_actions=optimal_actions, **summary)
+
+
 @router.post("/{map_id}", response_model=MapResponse)
-async def update_map(map_id: str, map_config: MapConfig, db: AsyncSession = Depends(get_db)):
+async def update_map(map_id: str, map_config: MapConfig, allow_unsolvable: bool = False,
+                     db: AsyncSession = Depends(get_db)):
     existing_map = await crud_map.get_map_by_map_id(map_id, db)
     if not existing_map:
         raise HTTPException(status_code=404, detail="Map not found")
 
-    updated_map = await crud_map.update_map(map_id, map_config, db)
+    updated_map = await crud_map.update_map(map_id, map_config, db, allow_unsolvable)
     return MapResponse(type=1103, **updated_map.model_dump())
 
 
@@ -1,17 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.etag import not_modified, revision_etag, set_etag
 from app.schemas.model import ModelListResponse, ModelResponse, ModelConfig
-from app.database.session import get_db
-from app.crud import crud_model
+from app.schemas.policy import (
+    ActRequest, ActResponse, ActBatchRequest, ActBatchResponse, EvaluateRequest, EvaluateResponse,
+)
+from app.database.session import AsyncSessionLocal, get_db
+from app.crud import crud_model, crud_map
+from app.services.evaluation import evaluator
+from app.services.policy_server import policy_server, CheckpointNotFound, encode_map_states
+from app.services.trainer import build_encoder
 
 router = APIRouter()
 
 @router.get("/user/{user_id}", response_model=ModelListResponse)
-async def get_models_by_user_id(user_id: str, db: AsyncSession = Depends(get_db)):
-    models = await crud_model.get_all_models(db)
-    user_models = [m for m in models if m.model_owner_id == user_id]
-    return ModelListResponse(type=1200, models=user_models) if user_models else ModelListResponse(type=1200, models=[])
+async def get_models_by_user_id(user_id: str, limit: Optional[int] = Query(None, ge=1, le=1000),
+                                cursor: Optional[str] = None, summary: bool = False,
+                                db: AsyncSession = Depends(get_db)):
+    models, next_cursor = await crud_model.get_models(db, owner_id=user_id, limit=limit, cursor=cursor,
+                                                      summary=summary)
+    return ModelListResponse(type=1200, models=models, next_cursor=next_cursor)
 
 
 @router.post("/", response_model=ModelResponse)
@@ -21,14 +33,23 @@ async def create_model(model: ModelConfig, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/", response_model=ModelListResponse)
-async def get_all_models(db: AsyncSession = Depends(get_db)):
-    models = await crud_model.get_all_models(db)
-    return ModelListResponse(type=1200, models=models)
+async def get_all_models(limit: Optional[int] = Query(None, ge=1, le=1000), cursor: Optional[str] = None,
+                         summary: bool = False, db: AsyncSession = Depends(get_db)):
+    """limit를 주면 한 페이지씩 반환하고, 다음 페이지는 next_cursor를 cursor로 넘겨 요청합니다."""
+    models, next_cursor = await crud_model.get_models(db, limit=limit, cursor=cursor, summary=summary)
+    return ModelListResponse(type=1200, models=models, next_cursor=next_cursor)
 
 
-@router.get("/{model_id}", response_model=ModelResponse)
-async def get_model_by_model_id(model_id: str, db: AsyncSession = Depends(get_db)):
+@router.get("/{model_id}", response_model=ModelResponse, responses={304: {"description": "Not Modified"}})
+async def get_model_by_model_id(model_id: str, request: Request, response: Response,
+                                db: AsyncSession = Depends(get_db)):
+    """ETag는 모델의 revision 기준이며, If-None-Match가 일치하면 본문 없이 304를 반환합니다."""
     model = await crud_model.get_model_by_model_id(model_id, db)
+    etag = revision_etag(model_id, model.revision)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    set_etag(response, etag)
     return ModelResponse(type=1202, **model.model_dump())
 
 
@@ -46,3 +67,65 @@ async def update_model(model_id: str, model_config: ModelConfig, db: AsyncSessio
 async def delete_model(user_id: str, model_id: str, db: AsyncSession = Depends(get_db)):
     await crud_model.delete_model(user_id, model_id, db)
     return {"type": 1204, "isRemoved": True}
+
+
+async def run_policy(model_id: str, states, db: AsyncSession):
+    model = await crud_model.get_model_by_model_id(model_id, db)
+    try:
+        return await policy_server.act(model_id, model.model_url, states)
+    except CheckpointNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.post("/{model_id}/act", response_model=ActResponse)
+async def act(model_id: str, request: ActRequest, db: AsyncSession = Depends(get_db)):
+    """상태 하나에 대한 greedy 행동과 Q값. 동시에 들어온 요청은 서버에서 한 배치로 묶어 계산합니다."""
+    actions, q_values = await run_policy(model_id, [request.state], db)
+    return ActResponse(type=1205, model_id=model_id, action=int(actions[0]), q_values=q_values[0].tolist())
+
+
+@router.post("/{model_id}/act/batch", response_model=ActBatchResponse)
+async def act_batch(model_id: str, request: ActBatchRequest, db: AsyncSession = Depends(get_db)):
+    """
+    states(관측 벡터) 또는 map_states(map_id, 에이전트 위치, 먹은 비트 위치)에 대한 greedy 행동과 Q값.
+    map_states는 서버가 모델의 관측 인코딩(xy_bits/local_view/grid)으로 변환하므로 클라이언트가 인코더를 구현할 필요가 없습니다.
+    """
+    states = request.states
+    if request.map_states is not None:
+        model = await crud_model.get_model_by_model_id(model_id, db)
+        map_ids = dict.fromkeys(state.map_id for state in request.map_states)
+        map_configs = {map_id: (await crud_map.get_map_by_map_id(map_id, db)).model_dump() for map_id in map_ids}
+        try:
+            states = await run_in_threadpool(encode_map_states, build_encoder(model.model_dump()), map_configs,
+                                             [state.model_dump() for state in request.map_states])
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    actions, q_values = await run_policy(model_id, states, db)
+    return ActBatchResponse(type=1206, model_id=model_id, actions=actions.tolist(), q_values=q_values.tolist())
+
+
+@router.post("/{model_id}/evaluate", response_model=EvaluateResponse)
+async def evaluate(model_id: str, request: EvaluateRequest):
+    """
+    가중치를 바꾸지 않고 여러 맵에서 정책을 실행해 성공률, 평균 보상, 평균 스텝 수를 계산합니다.
+    학습 워커와 별도의 평가 프로세스에서 실행됩니다.
+    평가는 오래 걸릴 수 있으므로 모델/맵을 읽은 뒤 DB 세션을 닫고 기다립니다.
+    """
+    async with AsyncSessionLocal() as db:
+        model = await crud_model.get_model_by_model_id(model_id, db)
+        maps = [await crud_map.get_map_by_map_id(map_id, db) for map_id in request.map_ids]
+    try:
+        results = await evaluator.evaluate(
+            model.model_dump(), [m.model_dump() for m in maps],
+            episodes=request.episodes, epsilon=request.epsilon,
+            include_trajectories=request.include_trajectories, seed=request.seed, policy=request.policy,
+        )
+    except CheckpointNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    total = sum(r["episodes"] for r in results)
+    success_rate = sum(r["success_rate"] * r["episodes"] for r in results) / total
+    return EvaluateResponse(type=1207, model_id=model_id, success_rate=success_rate, results=results)
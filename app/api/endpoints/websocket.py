@@ -1,237 +1,155 @@
-import os
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.crud import crud_model, crud_map
-from app.services.dqn_agent import DQNAgent
-from app.services.rl_environment import My2DEnv, Size, GridPosition
-from app.database.session import get_db
-import torch
 import asyncio
-import time
-
-router = APIRouter()
+from typing import Literal
 
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query
+from app.crud import crud_model, crud_map
+from app.services.frame_codec import encode_step_frame
+from app.services.telemetry import TelemetryMode
+from app.services.job_scheduler import job_scheduler, TrainingJob
+from app.database.session import AsyncSessionLocal
 
-@router.websocket("/train_dqn/{model_id}/{map_id}")
-async def websocket_dqn_train(websocket: WebSocket, model_id: str, map_id: str, db: AsyncSession = Depends(get_db)):
-    await websocket.accept()
+router = APIRouter()
 
-    device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    map_schema = await crud_map.get_map_by_map_id(map_id, db)
-    model_schema = await crud_model.get_model_by_model_id(model_id, db)
+async def send_event(websocket: WebSocket, event: dict, encoding: str):
+    """encoding=binary면 스텝 기록은 바이너리 프레임으로, 나머지 이벤트는 JSON 텍스트로 보냅니다."""
+    if encoding == "binary":
+        if event["event"] == "steps":
+            await websocket.send_bytes(encode_step_frame(event["records"]))
+            return
+        if event["event"] == "step":
+            await websocket.send_bytes(encode_step_frame([{k: v for k, v in event.items() if k != "event"}]))
+            return
+    await websocket.send_json(event)
 
-    if not map_schema:
-        await websocket.close(code=4004, reason="Map not found")
-        return
 
-    if not model_schema:
-        await websocket.close(code=4004, reason="Model not found")
+async def wait_disconnect(websocket: WebSocket):
+    """클라이언트가 보내는 메시지는 무시하고 연결이 끊길 때까지 기다립니다."""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+    except (WebSocketDisconnect, RuntimeError):
         return
 
-    env = My2DEnv(
-        grid_size=Size(map_schema.map_size[0], map_schema.map_size[1]),
-        walls=[GridPosition(wall.x, wall.y) for wall in map_schema.wall_list],
-        traps=[GridPosition(trap.x, trap.y) for trap in map_schema.trap_list],
-        bits=[GridPosition(bit.x, bit.y) for bit in map_schema.bit_list],
-        goal=GridPosition(map_schema.exit_pos.x, map_schema.exit_pos.y),
-        agent_start=GridPosition(map_schema.agent_pos.x, map_schema.agent_pos.y),
-        max_steps=map_schema.max_steps
-    )
-    action_dim = 4
-    agent = DQNAgent(
-        action_dim=action_dim,
-        state_dim=env.max_bits + 2,
-        device=device,
-        learning_rate=model_schema.learning_rate,
-        batch_size=model_schema.batch_size,
-        gamma=model_schema.gamma,
-        epsilon_start=model_schema.epsilon_start,
-        epsilon_min=model_schema.epsilon_min,
-        epsilon_decay=model_schema.epsilon_decay,
-        update_target_every=model_schema.update_target_every
-    )
-
-    model_path = model_schema.model_url
-    if model_path and os.path.exists(model_path):
-        agent.model.load_state_dict(torch.load(model_path, map_location=device))
-        agent.target.load_state_dict(agent.model.state_dict())
-        await websocket.send_json({"event": "model_loaded", "model_url": model_path})
-    else:
-        await websocket.send_json({"event": "model_created"})
 
+async def watch_job(websocket: WebSocket, job: TrainingJob, encoding: str, viewer=None):
+    """
+    학습 작업에 시청자로 붙어 이벤트를 중계합니다. 연결이 끊겨도 작업 자체는 스케줄러가 관리합니다.
+    viewer를 주면 이미 붙여 둔 시청자 큐를 사용합니다 (submit 전에 붙여야 job_started를 놓치지 않음).
+    """
+    if viewer is None:
+        viewer = job.attach()
     try:
-        episode = 0
-        start = time.time()
-        while True:
-            state, _ = env.reset()
-            total_reward = 0
-            reward = 0
-            step = 0
-            done = False
-            while not done:
-                action = agent.select_action(state)
-                next_state, reward, terminated, truncated, _ = env.step(action)
-                done = terminated or truncated
-                agent.store(state, action, reward, next_state, done)
-                loss = agent.train_step()
-                agent.update_epsilon()
-                state = next_state
-                total_reward += reward
-                step += 1
-
-                # 여기서는 별도의 try-except 없이 바로 전송
-                await asyncio.sleep(0)
-                await websocket.send_json({
-                    "event": "step",
-                    "episode": episode,
-                    "step": step,
-                    "state": state.tolist(),
-                    "action": action,
-                    "reward": reward,
-                    "total_reward": total_reward,
-                    "loss": loss,
-                    "epsilon": agent.epsilon,
-                    "terminated": terminated,
-                    "truncated": truncated
-                })
-
-                env.render()
-                if terminated or truncated:
-                    break
-
-            if episode % agent.update_target_every == 0:
-                agent.update_target_network()
-
-            if reward >= 1.0:
-                await websocket.send_json(
-                    {"event": "episode_success", "episode": episode, "total_reward": total_reward})
-                break
-
-            episode += 1
-        end = time.time()
-
-        torch.save(agent.model.state_dict(), model_path)
-        await asyncio.sleep(0)
-        await websocket.send_json({"event": "model_saved", "model_url": model_path})
-        print(f"Training completed in {end - start:.2f} seconds, total episodes: {episode + 1}", flush=True)
+        await websocket.send_json({"event": "job_status", **job_scheduler.schema(job).model_dump(mode="json")})
+        if job.active:
+            async def forward():
+                while True:
+                    event = await viewer.get()
+                    if event is None:
+                        return
+                    await send_event(websocket, event, encoding)
+
+            tasks = {asyncio.create_task(forward()), asyncio.create_task(wait_disconnect(websocket))}
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
 
     except WebSocketDisconnect:
         print("WebSocket disconnected by client", flush=True)
     # 추가 close 불필요
     except Exception as e:
         print(f"Other error: {e}", flush=True)
+    finally:
+        job_scheduler.detach(job, viewer)
     try:
         await websocket.close()
     except RuntimeError:
         print("Cannot close websocket, already closed", flush=True)
 
 
-@router.websocket("/train_dqn/{model_id}/{map_id}/loop")
-async def websocket_dqn_train_loop(websocket: WebSocket, model_id: str, map_id: str, db: AsyncSession = Depends(get_db)):
-    await websocket.accept()
-
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-
-    map_schema = await crud_map.get_map_by_map_id(map_id, db)
-    model_schema = await crud_model.get_model_by_model_id(model_id, db)
-
-    if not map_schema:
-        await websocket.close(code=4004, reason="Map not found")
+async def stream_training(websocket: WebSocket, model_id: str, map_id: str, loop: bool,
+                          telemetry: dict, encoding: str):
+    """
+    같은 모델/맵으로 실행 중인 작업이 있으면 그 작업을 시청하고, 없으면 새 작업을 등록해 시청합니다.
+    실행 중인 작업의 loop/telemetry 설정이 요청과 다르면 다른 형식의 이벤트를 받게 되므로 4009로 거절합니다
+    (그 작업을 그대로 보려면 /ws/jobs/{job_id}). 이 경로로 만든 작업은 마지막 시청자가 떠나면 취소됩니다.
+    맵/모델 설정을 읽는 동안만 DB 세션을 열고, 연결이 유지되는 동안에는 커넥션을 잡고 있지 않습니다.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            map_schema = await crud_map.get_map_by_map_id(map_id, db)
+            model_schema = await crud_model.get_model_by_model_id(model_id, db)
+    except HTTPException as e:
+        await websocket.close(code=4004, reason=e.detail)
         return
 
-    if not model_schema:
-        await websocket.close(code=4004, reason="Model not found")
+    # 분석에서 풀 수 없다고 판정된 맵은 학습하지 않음 (분석 전에 만든 맵은 solvable이 None)
+    if map_schema.solvable is False:
+        await websocket.close(code=4022, reason="Map is not solvable")
         return
 
-    env = My2DEnv(
-        grid_size=Size(map_schema.map_size[0], map_schema.map_size[1]),
-        walls=[GridPosition(wall.x, wall.y) for wall in map_schema.wall_list],
-        traps=[GridPosition(trap.x, trap.y) for trap in map_schema.trap_list],
-        bits=[GridPosition(bit.x, bit.y) for bit in map_schema.bit_list],
-        goal=GridPosition(map_schema.exit_pos.x, map_schema.exit_pos.y),
-        agent_start=GridPosition(map_schema.agent_pos.x, map_schema.agent_pos.y),
-        max_steps=map_schema.max_steps
-    )
-    action_dim = 4
-    agent = DQNAgent(
-        action_dim=action_dim,
-        state_dim=env.max_bits + 2,
-        device=device,
-        learning_rate=model_schema.learning_rate,
-        batch_size=model_schema.batch_size,
-        gamma=model_schema.gamma,
-        epsilon_start=model_schema.epsilon_start,
-        epsilon_min=model_schema.epsilon_min,
-        epsilon_decay=model_schema.epsilon_decay,
-        update_target_every=model_schema.update_target_every
+    job = job_scheduler.find_active(model_id, map_id)
+    if job is not None and (job.loop != loop or job.telemetry != telemetry):
+        await websocket.close(code=4009, reason=f"Job {job.job_id} is already running with different options")
+        return
+    if job is not None:
+        await watch_job(websocket, job, encoding)
+        return
+    job = TrainingJob(
+        user_id=model_schema.model_owner_id,
+        map_config=map_schema.model_dump(),
+        model_config=model_schema.model_dump(),
+        loop=loop,
+        telemetry=telemetry,
+        limits={},
+        cancel_on_detach=True,
     )
+    # 작업이 바로 시작되면 submit 안에서 job_started가 발행되므로 먼저 시청자로 붙음
+    viewer = job.attach()
+    job_scheduler.submit(job)
+    await watch_job(websocket, job, encoding, viewer)
 
-    model_path = model_schema.model_url
-    if model_path and os.path.exists(model_path):
-        agent.model.load_state_dict(torch.load(model_path, map_location=device))
-        agent.target.load_state_dict(agent.model.state_dict())
-        await websocket.send_json({"event": "model_loaded", "model_url": model_path})
-    else:
-        await websocket.send_json({"event": "model_created"})
 
-    try:
-        episode = 0
-        while True:
-            state, _ = env.reset()
-            total_reward = 0
-            reward = 0
-            step = 0
-            done = False
-            while not done:
-                action = agent.select_action(state)
-                next_state, reward, terminated, truncated, _ = env.step(action)
-                done = terminated or truncated
-                agent.store(state, action, reward, next_state, done)
-                loss = agent.train_step()
-                agent.update_epsilon()
-                state = next_state
-                total_reward += reward
-                step += 1
-
-                # 여기서는 별도의 try-except 없이 바로 전송
-                await websocket.send_json({
-                    "event": "step",
-                    "episode": episode,
-                    "step": step,
-                    "state": state.tolist(),
-                    "action": action,
-                    "reward": reward,
-                    "total_reward": total_reward,
-                    "loss": loss,
-                    "epsilon": agent.epsilon,
-                    "terminated": terminated,
-                    "truncated": truncated,
-                    "success": env.success
-                })
-                await asyncio.sleep(0)
-
-                env.render()
-                if terminated or truncated:
-                    break
-
-            if episode % agent.update_target_every == 0:
-                agent.update_target_network()
-
-            if reward >= 1.0:
-                await websocket.send_json(
-                    {"event": "episode_success", "episode": episode, "total_reward": total_reward})
-                torch.save(agent.model.state_dict(), model_path)
-                await asyncio.sleep(0)
-                await websocket.send_json({"event": "model_saved", "model_url": model_path})
-            episode += 1
+def telemetry_params(
+        telemetry: TelemetryMode = Query("every_step"),
+        telemetry_n: int = Query(100, ge=1),
+        telemetry_hz: float = Query(10.0, gt=0),
+        render_every: int = Query(0, ge=0),
+):
+    """
+    ?telemetry=every_step|every_n_steps|interval|per_episode_summary&telemetry_n=100&telemetry_hz=10
+    render_every=N이면 N 에피소드마다 마지막 장면을 "render" 이벤트(ansi 문자열)로 보냄
+    """
+    return {"mode": telemetry, "every_n": telemetry_n, "hz": telemetry_hz, "render_every": render_every}
 
-    except WebSocketDisconnect:
-        print("WebSocket disconnected by client", flush=True)
-    # 추가 close 불필요
-    except Exception as e:
-        print(f"Other error: {e}", flush=True)
-    try:
-        await websocket.close()
-    except RuntimeError:
-        print("Cannot close websocket, already closed", flush=True)
+
+# ?encoding=binary: 스텝 기록을 바이너리 프레임(app/services/frame_codec.py)으로 받음
+StreamEncoding = Literal["json", "binary"]
+
+
+@router.websocket("/train_dqn/{model_id}/{map_id}")
+async def websocket_dqn_train(websocket: WebSocket, model_id: str, map_id: str,
+                              telemetry: dict = Depends(telemetry_params), encoding: StreamEncoding = "json"):
+    await websocket.accept()
+    await stream_training(websocket, model_id, map_id, loop=False, telemetry=telemetry, encoding=encoding)
+
+
+@router.websocket("/train_dqn/{model_id}/{map_id}/loop")
+async def websocket_dqn_train_loop(websocket: WebSocket, model_id: str, map_id: str,
+                                   telemetry: dict = Depends(telemetry_params), encoding: StreamEncoding = "json"):
+    await websocket.accept()
+    await stream_training(websocket, model_id, map_id, loop=True, telemetry=telemetry, encoding=encoding)
+
+
+@router.websocket("/jobs/{job_id}")
+async def websocket_job(websocket: WebSocket, job_id: str, encoding: StreamEncoding = "json"):
+    await websocket.accept()
+    job = job_scheduler.get(job_id)
+    if job is None:
+        await websocket.close(code=4004, reason="Job not found")
+        return
+    await watch_job(websocket, job, encoding)
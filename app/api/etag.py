@@ -0,0 +1,26 @@
+from fastapi import Request, Response
+
+
+def revision_etag(resource_id: str, revision: int):
+    """리소스 id와 revision으로 만드는 ETag. 수정할 때마다 revision이 오르므로 내용이 바뀌면 ETag도 바뀝니다."""
+    return f'"{resource_id}-{revision}"'
+
+
+def not_modified(request: Request, etag: str):
+    """
+    If-None-Match가 etag와 일치하면 304 응답을, 아니면 None을 반환합니다.
+    약한 비교(W/ 접두사 무시)와 "*", 쉼표로 나열된 여러 값을 지원합니다.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def set_etag(response: Response, etag: str):
+    # no-cache: 캐시해도 되지만 쓰기 전에 항상 If-None-Match로 재검증
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
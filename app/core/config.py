@@ -2,10 +2,51 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # DB 커넥션 풀: 유지할 커넥션 수, 초과 허용 수, 빌릴 때 최대 대기(초), 재연결 주기(초), 빌릴 때 살아 있는지 확인
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 학습 워커 프로세스 수 (동시에 학습 가능한 세션 수)
+    TRAINING_WORKERS: int = 2
+    # 학습에 사용할 디바이스 목록 (예: "cuda:0,cuda:1"), 비어 있으면 자동 감지
+    TRAINING_DEVICES: str = ""
+    # 디바이스당 동시에 실행할 학습 작업 수
+    MAX_JOBS_PER_DEVICE: int = 2
+    # 체크포인트 저장 최소 간격(초, 최고 기록 갱신 시에는 무시)과 모델별 보관 버전 수
+    CHECKPOINT_MIN_INTERVAL: float = 30.0
+    CHECKPOINT_KEEP: int = 5
+    # 프로세스별 LRU 캐시 한도: 컴파일된 맵, 불러온 체크포인트 (항목 수, 바이트)
+    MAP_CACHE_SIZE: int = 256
+    MAP_CACHE_BYTES: int = 64 * 1024 * 1024
+    CHECKPOINT_CACHE_SIZE: int = 32
+    CHECKPOINT_CACHE_BYTES: int = 256 * 1024 * 1024
+    # API 프로세스의 맵/모델 조회 캐시: 항목 수와 유효 시간(초). 다른 프로세스에서 수정한 내용은 최대 TTL만큼 늦게 보임
+    SCHEMA_CACHE_SIZE: int = 1024
+    SCHEMA_CACHE_TTL: float = 30.0
+    # 추론 API: 디바이스, 캐시할 네트워크 수, 마이크로 배치 최대 크기와 모으는 시간(ms)
+    POLICY_DEVICE: str = "cpu"
+    POLICY_CACHE_SIZE: int = 16
+    POLICY_MAX_BATCH: int = 1024
+    POLICY_MAX_WAIT_MS: float = 5.0
+    # 평가(rollout) 전용 워커 프로세스 수(여러 맵은 워커별로 나눠 병렬 평가)와 맵당 동시에 진행할 최대 환경 수
+    EVALUATION_WORKERS: int = 2
+    EVALUATION_MAX_ENVS: int = 256
+    # 맵 생성/수정 시 정확한 해(최소 스텝 수)까지 구하는 최대 상태 수 (셀 수 × 2^비트 수).
+    # 넘으면 도달 가능성만 검사하고 min_steps는 비워 두며, 정확한 해는 /maps/{map_id}/solution에서 계산
+    MAP_ANALYSIS_MAX_STATES: int = 1 << 14
+    # NDJSON 맵 가져오기에서 한 번에 분석/INSERT하는 맵 수와 한 줄의 최대 크기(바이트)
+    MAP_IMPORT_BATCH: int = 500
+    MAP_IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    # 맵 이미지 업로드 최대 크기와 디스크에 쓰는 단위(바이트), 이미지 응답의 브라우저 캐시 시간(초)
+    MAP_IMAGE_MAX_BYTES: int = 10 * 1024 * 1024
+    MAP_IMAGE_CHUNK_BYTES: int = 1024 * 1024
+    MAP_IMAGE_MAX_AGE: int = 3600
 
     class Config:
         env_file = ".env"
         # 아래 한 줄을 추가합니다.
         extra = "ignore"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,15 +1,30 @@
 import uuid
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.map import MapModel
-from app.schemas.map import MapConfig, MapSchema
+from app.schemas.map import MapConfig, MapSchema, MapSummary
+from app.services.cache import invalidate_map, map_schema_cache
+from app.services.map_analysis import analyze_map
 from sqlalchemy.future import select
 from fastapi import HTTPException
 import os
 
 
-async def create_map(map_config: MapConfig, db: AsyncSession):
+async def analyze_or_reject(map_config: MapConfig, allow_unsolvable: bool):
+    """
+    맵을 분석하고, 풀 수 없는 맵이면 allow_unsolvable이 아닌 한 422로 거부합니다.
+    큰 맵은 분석에 수백 ms가 걸리므로 이벤트 루프를 막지 않도록 스레드 풀에서 실행합니다.
+    """
+    analysis = await run_in_threadpool(analyze_map, map_config.model_dump())
+    if not analysis["solvable"] and not allow_unsolvable:
+        raise HTTPException(status_code=422, detail={"message": "Map is not solvable", **analysis})
+    return analysis
+
+
+def new_map(map_config: MapConfig, analysis: dict):
+    """분석 결과와 함께 새 map_id로 MapModel을 만듭니다 (세션에 추가/커밋하지 않음)."""
     map_id = f"map_{uuid.uuid4().hex[:6]}"
     map_url = f"{os.getenv('MAP_IMAGE_PATH')}/{map_id}.png"  # Placeholder URL, replace with actual logic if needed
     db_map = MapModel(
@@ -25,63 +40,102 @@ async def create_map(map_config: MapConfig, db: AsyncSession):
         wall_list=[pos.model_dump() for pos in map_config.wall_list],
         bit_list=[pos.model_dump() for pos in map_config.bit_list],
         trap_list=[pos.model_dump() for pos in map_config.trap_list],
-        max_steps=map_config.max_steps
+        max_steps=map_config.max_steps,
+        **analysis
     )
+    return db_map, MapSchema(**map_config.model_dump(), map_id=map_id, map_url=map_url, **analysis)
+
+
+async def create_map(map_config: MapConfig, db: AsyncSession, allow_unsolvable: bool = False):
+    analysis = await analyze_or_reject(map_config, allow_unsolvable)
+    db_map, schema = new_map(map_config, analysis)
     db.add(db_map)
     await db.commit()
-    return MapSchema(**map_config.model_dump(), map_id=map_id, map_url=map_url)
-
-
-async def get_all_maps(db: AsyncSession):
-    result = await db.execute(select(MapModel))
-    maps = result.scalars().all()
-    return [
-        MapSchema(
-            map_id=m.map_id,
-            map_url=m.map_url,
-            map_name=m.map_name,
-            map_type=m.map_type,
-            map_owner_id=m.map_owner_id,
-            map_owner_name=m.map_owner_name,
-            map_size=m.map_size,
-            agent_pos=m.agent_pos,
-            exit_pos=m.exit_pos,
-            wall_list=m.wall_list,
-            bit_list=m.bit_list,
-            trap_list=m.trap_list,
-            max_steps=m.max_steps
-        ) for m in maps
-    ]
-
-
-async def get_map_by_map_id(map_id: str, db: AsyncSession):
+    return schema
+
+
+async def add_maps(map_configs: list, db: AsyncSession, allow_unsolvable: bool = False, atomic: bool = True,
+                   indexes: list = None):
+    """
+    여러 맵을 분석해 세션에 한 번에 추가하고 (schemas, errors)를 반환합니다. 커밋은 호출하는 쪽에서 합니다.
+    분석은 스레드 풀에서 실행하며, 풀 수 없는 맵은 atomic이면 아무것도 추가하지 않고 422,
+    아니면 건너뛰고 errors에 {"index", "detail"}로 담습니다 (index는 indexes의 값, 없으면 목록에서의 위치).
+    """
+    analyses = await run_in_threadpool(lambda: [analyze_map(config.model_dump()) for config in map_configs])
+    db_maps, schemas, errors = [], [], []
+    for index, map_config, analysis in zip(indexes or range(len(map_configs)), map_configs, analyses):
+        if not analysis["solvable"] and not allow_unsolvable:
+            detail = {"message": "Map is not solvable", "index": index, **analysis}
+            if atomic:
+                raise HTTPException(status_code=422, detail=detail)
+            errors.append({"index": index, "detail": detail})
+            continue
+        db_map, schema = new_map(map_config, analysis)
+        db_maps.append(db_map)
+        schemas.append(schema)
+    db.add_all(db_maps)
+    return schemas, errors
+
+
+async def create_maps(map_configs: list, db: AsyncSession, allow_unsolvable: bool = False, atomic: bool = True):
+    """add_maps 후 한 번만 커밋합니다 (맵마다 커밋하지 않음)."""
+    schemas, errors = await add_maps(map_configs, db, allow_unsolvable, atomic)
+    await db.commit()
+    return schemas, errors
+
+
+async def get_maps(db: AsyncSession, owner_id: str = None, limit: int = None, cursor: str = None,
+                   summary: bool = False):
+    """
+    맵 목록을 map_id 순서로 읽어 (목록, 다음 cursor)를 반환합니다.
+    owner_id로 거르고, cursor(이전 페이지의 마지막 map_id) 다음부터 limit개를 가져옵니다 (keyset 페이지네이션).
+    summary면 MapSummary 컬럼만 읽어 벽/비트/함정 목록은 DB에서 가져오지 않습니다.
+    """
+    columns = [getattr(MapModel, name) for name in MapSummary.model_fields]
+    query = select(*columns) if summary else select(MapModel)
+    if owner_id is not None:
+        query = query.where(MapModel.map_owner_id == owner_id)
+    if cursor is not None:
+        query = query.where(MapModel.map_id > cursor)
+    query = query.order_by(MapModel.map_id)
+    if limit is not None:
+        # 한 행 더 읽어 다음 페이지가 있는지 확인
+        query = query.limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.all() if summary else result.scalars().all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].map_id
+    if summary:
+        return [MapSummary(**row._mapping) for row in rows], next_cursor
+    return [MapSchema.from_model(m) for m in rows], next_cursor
+
+
+async def get_map_by_map_id(map_id: str, db: AsyncSession, use_cache: bool = True):
+    """
+    맵 하나를 읽습니다. use_cache면 map_schema_cache를 먼저 보고(read-through), 없으면 DB에서 읽어 넣습니다.
+    반환값은 캐시와 공유되므로 호출하는 쪽에서 수정하면 안 됩니다.
+    """
+    if use_cache:
+        schema = map_schema_cache.get((map_id,))
+        if schema is not None:
+            return schema
     result = await db.execute(select(MapModel).where(MapModel.map_id == map_id))
     m = result.scalar_one_or_none()
     if not m:
         raise HTTPException(status_code=404, detail="Map not found")
-    return MapSchema(
-        map_id=m.map_id,
-        map_url=m.map_url,
-        map_name=m.map_name,
-        map_type=m.map_type,
-        map_owner_id=m.map_owner_id,
-        map_owner_name=m.map_owner_name,
-        map_size=m.map_size,
-        agent_pos=m.agent_pos,
-        exit_pos=m.exit_pos,
-        wall_list=m.wall_list,
-        bit_list=m.bit_list,
-        trap_list=m.trap_list,
-        max_steps=m.max_steps
-    )
+    return map_schema_cache.put((map_id,), MapSchema.from_model(m))
 
 
-async def update_map(map_id: str, map_config: MapConfig, db: AsyncSession):
-    existing_map = await get_map_by_map_id(map_id, db)
+async def update_map(map_id: str, map_config: MapConfig, db: AsyncSession, allow_unsolvable: bool = False):
+    # revision을 올리므로 캐시가 아닌 DB의 현재 값을 기준으로 함
+    existing_map = await get_map_by_map_id(map_id, db, use_cache=False)
 
     if not existing_map:
         raise HTTPException(status_code=404, detail="Map not found")
 
+    analysis = await analyze_or_reject(map_config, allow_unsolvable)
     updated_map = MapModel(
         map_id=map_id,
         map_url=existing_map.map_url,
@@ -95,12 +149,16 @@ async def update_map(map_id: str, map_config: MapConfig, db: AsyncSession):
         wall_list=[pos.model_dump() for pos in map_config.wall_list],
         bit_list=[pos.model_dump() for pos in map_config.bit_list],
         trap_list=[pos.model_dump() for pos in map_config.trap_list],
-        max_steps=map_config.max_steps
+        max_steps=map_config.max_steps,
+        revision=existing_map.revision + 1,
+        **analysis
     )
 
     await db.merge(updated_map)
     await db.commit()
-    return MapSchema(map_id=map_id, map_url=updated_map.map_url, **map_config.model_dump())
+    invalidate_map(map_id)
+    return MapSchema(map_id=map_id, map_url=updated_map.map_url, revision=updated_map.revision,
+                     **map_config.model_dump(), **analysis)
 
 
 async def delete_map(user_id: str, map_id: str, db: AsyncSession):
@@ -114,4 +172,5 @@ async def delete_map(user_id: str, map_id: str, db: AsyncSession):
 
     await db.delete(target)
     await db.commit()
+    invalidate_map(map_id)
     return {"detail": "Map deleted successfully"}
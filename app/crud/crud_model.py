@@ -4,24 +4,53 @@ from sqlalchemy.future import select
 import uuid
 import os
 
-from app.schemas.model import ModelSchema, ModelConfig
+from app.schemas.model import ModelSchema, ModelConfig, ModelSummary
 from app.models.model import Model
-
-
-async def get_all_models(db: AsyncSession):
-    result = await db.execute(select(Model))
-    models = result.scalars().all()
-
-    return [ModelSchema.from_model(m)
-            for m in models]
-
-
-async def get_model_by_model_id(model_id: str, db: AsyncSession):
+from app.services.cache import invalidate_model, model_schema_cache
+
+
+async def get_models(db: AsyncSession, owner_id: str = None, limit: int = None, cursor: str = None,
+                     summary: bool = False):
+    """
+    모델 목록을 model_id 순서로 읽어 (목록, 다음 cursor)를 반환합니다.
+    owner_id로 거르고, cursor(이전 페이지의 마지막 model_id) 다음부터 limit개를 가져옵니다 (keyset 페이지네이션).
+    summary면 ModelSummary 컬럼만 읽습니다.
+    """
+    columns = [getattr(Model, name) for name in ModelSummary.model_fields]
+    query = select(*columns) if summary else select(Model)
+    if owner_id is not None:
+        query = query.where(Model.model_owner_id == owner_id)
+    if cursor is not None:
+        query = query.where(Model.model_id > cursor)
+    query = query.order_by(Model.model_id)
+    if limit is not None:
+        # 한 행 더 읽어 다음 페이지가 있는지 확인
+        query = query.limit(limit + 1)
+    result = await db.execute(query)
+    rows = result.all() if summary else result.scalars().all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].model_id
+    if summary:
+        return [ModelSummary(**row._mapping) for row in rows], next_cursor
+    return [ModelSchema.from_model(m) for m in rows], next_cursor
+
+
+async def get_model_by_model_id(model_id: str, db: AsyncSession, use_cache: bool = True):
+    """
+    모델 하나를 읽습니다. use_cache면 model_schema_cache를 먼저 보고(read-through), 없으면 DB에서 읽어 넣습니다.
+    반환값은 캐시와 공유되므로 호출하는 쪽에서 수정하면 안 됩니다.
+    """
+    if use_cache:
+        schema = model_schema_cache.get((model_id,))
+        if schema is not None:
+            return schema
     result = await db.execute(select(Model).where(Model.model_id == model_id))
     m = result.scalar_one_or_none()
     if not m:
         raise HTTPException(status_code=404, detail="Model not found")
-    return ModelSchema.from_model(m)
+    return model_schema_cache.put((model_id,), ModelSchema.from_model(m))
 
 
 async def create_model(model_config: ModelConfig, db: AsyncSession):
@@ -39,7 +68,8 @@ async def create_model(model_config: ModelConfig, db: AsyncSession):
 
 
 async def update_model(model_id: str, model_config: ModelConfig, db: AsyncSession):
-    existing_model = await get_model_by_model_id(model_id, db)
+    # revision을 올리므로 캐시가 아닌 DB의 현재 값을 기준으로 함
+    existing_model = await get_model_by_model_id(model_id, db, use_cache=False)
 
     if not existing_model:
         raise HTTPException(status_code=404, detail="Model not found")
@@ -48,11 +78,14 @@ async def update_model(model_id: str, model_config: ModelConfig, db: AsyncSessio
         model_id=model_id,
         model_url=existing_model.model_url,
         config=model_config,
+        revision=existing_model.revision + 1,
     )
 
     await db.merge(updated_model)
     await db.commit()
-    return ModelSchema(model_id=model_id, model_url=updated_model.model_url, **model_config.model_dump())
+    invalidate_model(model_id)
+    return ModelSchema(model_id=model_id, model_url=updated_model.model_url, revision=updated_model.revision,
+                       **model_config.model_dump())
 
 
 async def delete_model(user_id: str, model_id: str, db: AsyncSession):
@@ -66,4 +99,5 @@ async def delete_model(user_id: str, model_id: str, db: AsyncSession):
 
     await db.delete(target)
     await db.commit()
+    invalidate_model(model_id)
     return {"detail": "Model deleted successfully"}
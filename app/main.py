@@ -1,9 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import map, user, websocket, model
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from app.api.endpoints import map, user, websocket, model, job, curriculum, health
 
 from app.database.base import Base
 from app.database import engine
+from app.services.training_executor import training_executor
+from app.services.job_scheduler import job_scheduler
+from app.services.policy_server import policy_server
+from app.services.evaluation import evaluator
+from app.services.curriculum import curriculum_runner
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,6 +21,35 @@ async def create_db_and_tables():
     async with engine.begin() as conn:
         # Base.metadata는 models.py에 정의된 모든 테이블 정보를 담고 있습니다.
         await conn.run_sync(Base.metadata.create_all)
+        # create_all은 이미 있는 테이블에 나중에 추가된 컬럼/인덱스를 만들지 않으므로 따로 생성
+        await conn.run_sync(create_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+
+
+def create_missing_columns(conn):
+    """
+    이미 있는 테이블에 모델에만 있는 컬럼을 ALTER TABLE ... ADD COLUMN으로 추가합니다. 여러 번 실행해도 안전합니다.
+    NOT NULL 컬럼은 server_default가 있어야 기존 행을 채울 수 있습니다.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} without a server_default")
+            column_sql = CreateColumn(column).compile(dialect=conn.dialect)
+            table_sql = conn.dialect.identifier_preparer.format_table(table)
+            conn.exec_driver_sql(f"ALTER TABLE {table_sql} ADD COLUMN {column_sql}")
+
+
+def create_missing_indexes(conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 
 app = FastAPI(docs_url='/api/backend/docs')
@@ -31,12 +67,27 @@ app.include_router(map.router, prefix="/api/backend/maps")
 app.include_router(user.router, prefix="/api/backend/user")  # 사용자 관련 라우터 추가
 app.include_router(websocket.router, prefix="/api/backend/ws")  # 웹소켓 관련 라우터 추가
 app.include_router(model.router, prefix="/api/backend/models")  # 모델 관련 라우터 추가
+app.include_router(job.router, prefix="/api/backend/jobs")  # 학습 작업 관련 라우터 추가
+app.include_router(curriculum.router, prefix="/api/backend/curriculum")  # 커리큘럼 실행 라우터 추가
+app.include_router(health.router, prefix="/api/backend/health")  # DB/커넥션 풀 상태 라우터 추가
 
 
 @app.on_event("startup")
 async def on_startup():
     # 서버 시작 시 DB 테이블 생성
     await create_db_and_tables()
+    # 학습 워커 프로세스 풀 시작
+    training_executor.start()
     # 백그라운드에서 가격 생성기 실행
     # asyncio.create_task(websocket.price_generator())
     # asyncio.create_task(websocket.news_generator())
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    curriculum_runner.shutdown()
+    job_scheduler.shutdown()
+    training_executor.shutdown()
+    policy_server.shutdown()
+    evaluator.shutdown()
+    await engine.dispose()
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, JSON
+from sqlalchemy import Column, Integer, String, JSON, Boolean, Index
 from app.database.base import Base
 
 class MapModel(Base):
     __tablename__ = "maps"
+    # 사용자별 목록 조회(map_owner_id 조건 + map_id 순서의 keyset 페이지네이션)용
+    __table_args__ = (Index("ix_maps_owner_map_id", "map_owner_id", "map_id"),)
 
     map_id = Column(String, primary_key=True, index=True)
     map_url = Column(String)
@@ -17,3 +19,8 @@ class MapModel(Base):
     bit_list = Column(JSON)
     trap_list = Column(JSON)
     max_steps = Column(Integer)
+    revision = Column(Integer, nullable=False, default=1, server_default="1")  # 수정할 때마다 1씩 증가
+    # 생성/수정 시 분석 결과 (app/services/map_analysis.py), 분석 전에 만든 맵은 NULL
+    solvable = Column(Boolean, nullable=True)
+    min_steps = Column(Integer, nullable=True)  # 모든 비트를 먹고 출구까지 가는 최소 스텝 수 (상태가 많은 맵은 NULL)
+    issues = Column(JSON, nullable=True)
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, String, Float, Integer, JSON
+from sqlalchemy import Column, String, Float, Integer, JSON, Boolean, Index, false
 from app.database.base import Base
 
 class Model(Base):
     __tablename__ = "models"
+    # 사용자별 목록 조회(model_owner_id 조건 + model_id 순서의 keyset 페이지네이션)용
+    __table_args__ = (Index("ix_models_owner_model_id", "model_owner_id", "model_id"),)
 
     model_id = Column(String, primary_key=True, index=True)  # model_id
     model_url = Column(String, nullable=False)  # model_url
@@ -22,9 +24,23 @@ class Model(Base):
     epsilon_min = Column(Float, nullable=False)
     epsilon_decay = Column(Float, nullable=False)
     update_target_every = Column(Integer, nullable=False)
+    num_envs = Column(Integer, nullable=False, default=1, server_default="1")  # 세션당 병렬 환경 수
+    replay_capacity = Column(Integer, nullable=False, default=10000, server_default="10000")  # 리플레이 버퍼 크기
+    replay_type = Column(String, nullable=False, default="uniform", server_default="uniform")  # uniform / prioritized
+    priority_alpha = Column(Float, nullable=False, default=0.6, server_default="0.6")
+    priority_beta = Column(Float, nullable=False, default=0.4, server_default="0.4")
+    train_every = Column(Integer, nullable=False, default=1, server_default="1")  # 몇 스텝마다 업데이트할지
+    gradient_steps = Column(Integer, nullable=False, default=1, server_default="1")  # 업데이트마다 반복할 횟수
+    learning_starts = Column(Integer, nullable=False, default=0, server_default="0")  # 학습 시작 전 최소 전이 수
+    save_replay = Column(Boolean, nullable=False, default=False, server_default=false())  # 리플레이 버퍼 저장 여부
+    obs_encoding = Column(String, nullable=False, default="xy_bits", server_default="xy_bits")  # xy_bits / local_view
+    obs_bits = Column(Integer, nullable=False, default=3, server_default="3")  # xy_bits 관측의 비트 칸 수
+    view_radius = Column(Integer, nullable=False, default=2, server_default="2")  # local_view 관측 반경
+    grid_size = Column(Integer, nullable=False, default=16, server_default="16")  # grid 관측의 한 변 칸 수
+    revision = Column(Integer, nullable=False, default=1, server_default="1")  # 수정할 때마다 1씩 증가
 
     @classmethod
-    def from_model_config(cls, model_id: str, model_url: str, config):
+    def from_model_config(cls, model_id: str, model_url: str, config, revision: int = 1):
         """
         ModelConfig 객체(config)와 model_id, model_url을 받아 Model 인스턴스 생성
         """
@@ -41,5 +57,19 @@ class Model(Base):
             epsilon_start=config.epsilon_start,
             epsilon_min=config.epsilon_min,
             epsilon_decay=config.epsilon_decay,
-            update_target_every=config.update_target_every
+            update_target_every=config.update_target_every,
+            num_envs=config.num_envs,
+            replay_capacity=config.replay_capacity,
+            replay_type=config.replay_type,
+            priority_alpha=config.priority_alpha,
+            priority_beta=config.priority_beta,
+            train_every=config.train_every,
+            gradient_steps=config.gradient_steps,
+            learning_starts=config.learning_starts,
+            save_replay=config.save_replay,
+            obs_encoding=config.obs_encoding,
+            obs_bits=config.obs_bits,
+            view_radius=config.view_radius,
+            grid_size=config.grid_size,
+            revision=revision
         )
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.policy import MapEvaluation
+
+
+class CurriculumStage(BaseModel):
+    name: str
+    map_ids: List[str] = Field(min_length=1)
+    # 통과 기준: 단계의 모든 맵에서 평가 성공률이 이 값 이상
+    min_success_rate: float = Field(default=1.0, ge=0.0, le=1.0)
+
+
+class CurriculumCreate(BaseModel):
+    model_id: str
+    # 학습 작업의 공정 분배 기준 사용자. 비어 있으면 모델 소유자
+    user_id: Optional[str] = None
+    # 앞 단계부터 차례로 진행 (예: easy → normal → hard)
+    stages: List[CurriculumStage] = Field(min_length=1)
+    eval_episodes: int = Field(default=1, ge=1, le=10000)
+    eval_epsilon: float = Field(default=0.0, ge=0.0, le=1.0)
+    # 평가를 통과하지 못한 맵 하나당 학습 한도 (통과하지 못한 맵들은 한 작업으로 묶어 함께 학습)
+    train_episodes: int = Field(default=3000, ge=1)
+    train_seconds: Optional[float] = Field(default=None, gt=0)
+    # 한 단계를 max_attempts번 학습해도 통과하지 못하면 이전 단계 맵을 한 번 복습한 뒤 다시 시도
+    max_attempts: int = Field(default=3, ge=1)
+    # 전체 학습 라운드 한도. 넘으면 failed
+    max_rounds: int = Field(default=30, ge=1)
+
+
+CurriculumStatus = Literal["running", "completed", "failed", "cancelled"]
+
+
+class StageEvaluation(BaseModel):
+    round: int
+    stage: str
+    passed: bool
+    success_rate: float
+    results: List[MapEvaluation]
+
+
+class CurriculumSchema(BaseModel):
+    run_id: str
+    model_id: str
+    user_id: str
+    status: CurriculumStatus
+    stage_index: int
+    stage: Optional[str] = None
+    rounds: int = 0
+    current_job_id: Optional[str] = None
+    error: Optional[str] = None
+    evaluations: List[StageEvaluation] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class CurriculumResponse(CurriculumSchema):
+    type: int
+
+
+class CurriculumListResponse(BaseModel):
+    type: int
+    runs: List[CurriculumSchema]
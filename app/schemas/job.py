@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List, Optional, Literal
+
+from pydantic import BaseModel, Field
+
+from app.services.telemetry import TelemetryMode
+
+
+class JobCreate(BaseModel):
+    model_id: str
+    map_id: str
+    # map_id와 같은 배치에서 함께 학습할 맵 (관측 크기가 맵과 무관한 local_view/grid 인코딩에 적합)
+    extra_map_ids: List[str] = []
+    # 공정 분배 기준 사용자. 비어 있으면 모델 소유자
+    user_id: Optional[str] = None
+    # 종료 조건: stop_on_success면 첫 성공에서 저장 후 종료, 아니면 성공할 때마다 저장하며 계속 학습
+    stop_on_success: bool = False
+    max_episodes: Optional[int] = Field(default=None, ge=1)
+    max_successes: Optional[int] = Field(default=None, ge=1)
+    max_seconds: Optional[float] = Field(default=None, gt=0)
+    telemetry: TelemetryMode = "per_episode_summary"
+    telemetry_n: int = Field(default=100, ge=1)
+    telemetry_hz: float = Field(default=10.0, gt=0)
+    render_every: int = Field(default=0, ge=0)
+
+
+JobStatus = Literal["queued", "running", "completed", "cancelled", "failed"]
+
+
+class JobSchema(BaseModel):
+    job_id: str
+    model_id: str
+    map_id: str
+    extra_map_ids: List[str] = []
+    user_id: str
+    status: JobStatus
+    device: Optional[str] = None
+    queue_position: Optional[int] = None
+    episodes: int = 0
+    success: int = 0
+    stop_reason: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobResponse(JobSchema):
+    type: int
+
+
+class JobListResponse(BaseModel):
+    type: int
+    jobs: List[JobSchema]
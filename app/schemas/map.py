@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 
 
 class Position(BaseModel):
@@ -22,10 +22,86 @@ class MapConfig(BaseModel):
 class MapSchema(MapConfig):
     map_id: str
     map_url: str
+    revision: int = 1
+    solvable: Optional[bool] = None
+    min_steps: Optional[int] = None
+    issues: List[str] = []
+
+    @classmethod
+    def from_model(cls, m):
+        """SQLAlchemy MapModel 인스턴스로부터 MapSchema를 생성합니다."""
+        return cls(
+            map_id=m.map_id,
+            map_url=m.map_url,
+            map_name=m.map_name,
+            map_type=m.map_type,
+            map_owner_id=m.map_owner_id,
+            map_owner_name=m.map_owner_name,
+            map_size=m.map_size,
+            agent_pos=m.agent_pos,
+            exit_pos=m.exit_pos,
+            wall_list=m.wall_list,
+            bit_list=m.bit_list,
+            trap_list=m.trap_list,
+            max_steps=m.max_steps,
+            revision=m.revision,
+            solvable=m.solvable,
+            min_steps=m.min_steps,
+            issues=m.issues or [],
+        )
+
 class MapResponse(MapSchema):
     type: int
 
+class MapSummary(BaseModel):
+    """목록 화면용 요약 (벽/비트/함정 목록과 위치 제외)."""
+    map_id: str
+    map_url: str
+    map_name: str
+    map_type: str
+    map_owner_id: str
+    map_owner_name: str
+    map_size: Tuple[int, int]
+    max_steps: int
+    revision: int = 1
+    solvable: Optional[bool] = None
+    min_steps: Optional[int] = None
+
+
 class MapListResponse(BaseModel):
     type: int
     user_id: str
+    maps: List[Union[MapSchema, MapSummary]]
+    # 다음 페이지 요청에 cursor로 넘길 값. 마지막 페이지면 None
+    next_cursor: Optional[str] = None
+
+
+class MapBulkError(BaseModel):
+    # 요청 목록(NDJSON이면 줄)에서의 0부터 센 위치
+    index: int
+    detail: Union[dict, str]
+
+
+class MapBulkResponse(BaseModel):
+    type: int
     maps: List[MapSchema]
+    errors: List[MapBulkError] = []
+
+
+class MapImportResponse(BaseModel):
+    type: int
+    created: int
+    map_ids: List[str]
+    errors: List[MapBulkError] = []
+
+
+class MapSolutionResponse(BaseModel):
+    type: int
+    map_id: str
+    # reachable: 모든 비트를 먹고 출구에 도달할 수 있음, solvable: 그 최소 스텝 수가 max_steps 이내
+    reachable: bool
+    solvable: bool
+    min_steps: Optional[int] = None
+    optimal_return: Optional[float] = None
+    n_states: int
+    optimal_actions: List[int]
@@ -1,10 +1,13 @@
-from pydantic import BaseModel
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field, model_validator
 
 
 class ModelConfig(BaseModel):
     model_owner_id: str
     model_owner_name: str
     model_name: str
+    # dqn: MLP, cnn: 격자 관측(obs_encoding="grid")을 받는 CNN
     model_type: str
     learning_rate: float = 1e-3
     batch_size: int = 64
@@ -13,11 +16,43 @@ class ModelConfig(BaseModel):
     epsilon_min: float = 0.05
     epsilon_decay: float = 0.995
     update_target_every: int = 10
+    num_envs: int = 1
+    replay_capacity: int = 10000
+    replay_type: Literal["uniform", "prioritized"] = "uniform"
+    priority_alpha: float = 0.6
+    priority_beta: float = 0.4
+    train_every: int = 1
+    gradient_steps: int = 1
+    learning_starts: int = 0
+    # 체크포인트와 함께 리플레이 버퍼도 저장해 재접속 시 이어서 사용
+    save_replay: bool = False
+    # 관측 인코딩. xy_bits는 [x, y] + obs_bits개 비트 여부(비트가 더 많은 맵은 학습 불가),
+    # local_view는 맵 크기/비트 수와 무관한 주변 (2*view_radius+1)^2 칸 + 전역 특징,
+    # grid는 grid_size×grid_size 이하의 맵 전체를 5채널 격자로 (cnn 모델용)
+    obs_encoding: Literal["xy_bits", "local_view", "grid"] = "xy_bits"
+    obs_bits: int = Field(default=3, ge=1, le=64)
+    view_radius: int = Field(default=2, ge=1, le=8)
+    grid_size: int = Field(default=16, ge=3, le=64)
+
+    @model_validator(mode="before")
+    @classmethod
+    def default_cnn_encoding(cls, data):
+        # cnn 모델은 격자 관측만 받으므로 인코딩을 지정하지 않으면 grid
+        if isinstance(data, dict) and data.get("model_type") == "cnn" and data.get("obs_encoding") is None:
+            data = {**data, "obs_encoding": "grid"}
+        return data
+
+    @model_validator(mode="after")
+    def check_cnn_encoding(self):
+        if self.model_type == "cnn" and self.obs_encoding != "grid":
+            raise ValueError("model_type 'cnn' requires obs_encoding 'grid'")
+        return self
 
 
 class ModelSchema(ModelConfig):
     model_id: str
     model_url: str
+    revision: int = 1
 
     @classmethod
     def from_model(cls, model):
@@ -38,6 +73,20 @@ class ModelSchema(ModelConfig):
             epsilon_min=model.epsilon_min,
             epsilon_decay=model.epsilon_decay,
             update_target_every=model.update_target_every,
+            num_envs=model.num_envs,
+            replay_capacity=model.replay_capacity,
+            replay_type=model.replay_type,
+            priority_alpha=model.priority_alpha,
+            priority_beta=model.priority_beta,
+            train_every=model.train_every,
+            gradient_steps=model.gradient_steps,
+            learning_starts=model.learning_starts,
+            save_replay=model.save_replay,
+            obs_encoding=model.obs_encoding,
+            obs_bits=model.obs_bits,
+            view_radius=model.view_radius,
+            grid_size=model.grid_size,
+            revision=model.revision,
         )
 
 
@@ -45,6 +94,20 @@ class ModelResponse(ModelSchema):
     type: int
 
 
+class ModelSummary(BaseModel):
+    """목록 화면용 요약 (학습 하이퍼파라미터 제외)."""
+    model_id: str
+    model_url: str
+    model_owner_id: str
+    model_owner_name: str
+    model_name: str
+    model_type: str
+    obs_encoding: str
+    revision: int = 1
+
+
 class ModelListResponse(BaseModel):
     type: int
-    models: list[ModelSchema]
+    models: List[Union[ModelSchema, ModelSummary]]
+    # 다음 페이지 요청에 cursor로 넘길 값. 마지막 페이지면 None
+    next_cursor: Optional[str] = None
@@ -0,0 +1,74 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.map import Position
+
+
+class ActRequest(BaseModel):
+    # 학습 때와 같은 관측: [x, y, 비트별 먹음 여부...]
+    state: List[float]
+
+
+class MapState(BaseModel):
+    map_id: str
+    agent_pos: Position
+    # 이미 먹은 비트의 위치 (맵의 bit_list 중)
+    collected: List[Position] = []
+
+
+class ActBatchRequest(BaseModel):
+    # 모델의 관측 벡터를 직접 주거나, 맵 위의 상태를 주면 서버가 모델의 관측 인코딩으로 변환
+    states: Optional[List[List[float]]] = Field(default=None, min_length=1)
+    map_states: Optional[List[MapState]] = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def check_one_input(self):
+        if (self.states is None) == (self.map_states is None):
+            raise ValueError("Provide exactly one of 'states' or 'map_states'")
+        return self
+
+
+class ActResponse(BaseModel):
+    type: int
+    model_id: str
+    action: int
+    q_values: List[float]
+
+
+class ActBatchResponse(BaseModel):
+    type: int
+    model_id: str
+    actions: List[int]
+    q_values: List[List[float]]
+
+
+class EvaluateRequest(BaseModel):
+    map_ids: List[str] = Field(min_length=1)
+    # epsilon=0(greedy)이면 결정적이므로 episodes와 관계없이 맵마다 한 번만 실행
+    episodes: int = Field(default=1, ge=1, le=10000)
+    epsilon: float = Field(default=0.0, ge=0.0, le=1.0)
+    # 에피소드별 행동 배열(uint8, base64)을 함께 반환
+    include_trajectories: bool = False
+    seed: Optional[int] = None
+    # optimal이면 모델 대신 정확한 해(app/services/solver.py)의 최적 정책을 실행 (기준선)
+    policy: Literal["model", "optimal"] = "model"
+
+
+class MapEvaluation(BaseModel):
+    map_id: str
+    episodes: int
+    success_rate: float
+    mean_return: float
+    mean_steps: float
+    trajectories: Optional[List[str]] = None
+    # 기준선: 최소 스텝 수(도달 불가면 None)와 최적 정책의 보상
+    optimal_steps: Optional[int] = None
+    optimal_return: Optional[float] = None
+
+
+class EvaluateResponse(BaseModel):
+    type: int
+    model_id: str
+    success_rate: float
+    results: List[MapEvaluation]
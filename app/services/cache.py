@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+from app.core.config import settings
+from app.services.checkpoint import load_checkpoint
+from app.services.rl_environment import CompiledMap
+from app.services.solver import solve_map
+
+
+def estimate_nbytes(value):
+    """배열/텐서가 차지하는 메모리를 대략 계산합니다 (dict, list, 객체 속성까지 재귀적으로)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if torch.is_tensor(value):
+        return value.element_size() * value.nelement()
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value)
+    if hasattr(value, "__dict__"):
+        return estimate_nbytes(vars(value))
+    return 0
+
+
+class LRUCache:
+    """
+    항목 수(max_items)와 메모리(max_bytes) 두 기준으로 제한되는 스레드 안전 LRU 캐시.
+    키의 첫 원소를 소유자 id(map_id, model_id)로 두면 invalidate(id)로 해당 id의 모든 버전을 지울 수 있습니다.
+    ttl(초)을 주면 넣은 지 ttl이 지난 항목은 없는 것으로 봅니다.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int, ttl: float = None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self.nbytes -= self._items.pop(key)[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = estimate_nbytes(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            # 한도보다 큰 항목은 캐시하지 않음
+            if size > self.max_bytes or self.max_items <= 0:
+                return value
+            expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+            self._items[key] = (value, size, expires_at)
+            self.nbytes += size
+            while len(self._items) > self.max_items or self.nbytes > self.max_bytes:
+                _, (_, evicted, _) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def get_or_create(self, key, create):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, create())
+        return value
+
+    def invalidate(self, owner_id: str):
+        with self._lock:
+            for key in [key for key in self._items if key[0] == owner_id]:
+                self.nbytes -= self._items.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {"items": len(self._items), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+
+# 컴파일된 맵은 (map_id, revision), 체크포인트는 (model_id, 파일 버전) 키로 보관.
+# 학습 워커 프로세스마다 자체 캐시를 가지며, 키에 버전이 들어 있으므로 수정된 맵/새로 저장된 체크포인트는 자동으로 새로 읽습니다.
+map_cache = LRUCache(settings.MAP_CACHE_SIZE, settings.MAP_CACHE_BYTES)
+checkpoint_cache = LRUCache(settings.CHECKPOINT_CACHE_SIZE, settings.CHECKPOINT_CACHE_BYTES)
+# 추론용으로 디바이스에 올려 둔 네트워크 (키: 체크포인트 키 + 디바이스)
+policy_cache = LRUCache(settings.POLICY_CACHE_SIZE, settings.CHECKPOINT_CACHE_BYTES)
+# app/crud의 단건 조회 결과 MapSchema/ModelSchema (키: (map_id,), (model_id,)).
+# 같은 프로세스의 수정/삭제는 바로 지우고, 다른 프로세스의 수정은 TTL이 지나면 반영됨
+map_schema_cache = LRUCache(settings.SCHEMA_CACHE_SIZE, settings.MAP_CACHE_BYTES, ttl=settings.SCHEMA_CACHE_TTL)
+model_schema_cache = LRUCache(settings.SCHEMA_CACHE_SIZE, settings.MAP_CACHE_BYTES, ttl=settings.SCHEMA_CACHE_TTL)
+
+
+def get_compiled_map(map_config: dict):
+    """MapSchema.model_dump() 형태의 dict로 CompiledMap을 만들거나 캐시에서 꺼냅니다."""
+    return map_cache.get_or_create((map_config["map_id"], map_config["revision"]),
+                                   lambda: CompiledMap.from_config(map_config))
+
+
+def get_map_solution(map_config: dict):
+    """
+    맵의 정확한 해(MapSolution)를 계산하거나 캐시에서 꺼냅니다.
+    가치 표(values)는 보통 해보다 훨씬 크므로, 캐시에 넣기 전에 계산해 두어야 크기가 제대로 잡힙니다.
+    """
+    def solve():
+        solution = solve_map(map_config, get_compiled_map(map_config))
+        solution.values
+        return solution
+
+    return map_cache.get_or_create((map_config["map_id"], map_config["revision"], "solution"), solve)
+
+
+def checkpoint_key(model_id: str, path: str):
+    """
+    체크포인트 파일의 캐시 키. 파일이 없으면 None.
+    CheckpointWriter는 rename으로 파일을 교체하므로 (inode, mtime, 크기)가 곧 체크포인트 버전입니다.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return model_id, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def get_checkpoint(model_id: str, path: str):
+    """
+    체크포인트를 CPU로 읽어 캐시합니다. 파일이 없으면 None.
+    반환값은 캐시와 공유되므로 호출하는 쪽에서 수정하면 안 됩니다.
+    """
+    key = checkpoint_key(model_id, path)
+    if key is None:
+        return None
+    return checkpoint_cache.get_or_create(key, lambda: load_checkpoint(path))
+
+
+def put_checkpoint(model_id: str, path: str, snapshot: dict):
+    """방금 저장한 스냅샷을 캐시에 넣어, 같은 워커에서 다시 열 때 디스크를 읽지 않게 합니다."""
+    key = checkpoint_key(model_id, path)
+    if key is not None:
+        checkpoint_cache.put(key, snapshot)
+
+
+def invalidate_map(map_id: str):
+    map_cache.invalidate(map_id)
+    map_schema_cache.invalidate(map_id)
+
+
+def invalidate_model(model_id: str):
+    checkpoint_cache.invalidate(model_id)
+    policy_cache.invalidate(model_id)
+    model_schema_cache.invalidate(model_id)
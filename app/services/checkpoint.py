@@ -0,0 +1,215 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import torch
+
+CHECKPOINT_FORMAT = 2
+VERSION_PATTERN = re.compile(r"^(\d+)\.pth$")
+
+
+def _to_cpu(value):
+    """state_dict 안의 텐서를 CPU 복사본으로 바꿉니다. 학습이 계속되어도 스냅샷은 변하지 않습니다."""
+    if torch.is_tensor(value):
+        return value.detach().to("cpu", copy=True)
+    if isinstance(value, dict):
+        return {k: _to_cpu(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_to_cpu(v) for v in value)
+    return value
+
+
+def snapshot_agent(agent, include_replay=False, observation=None, **counters):
+    """
+    가중치, 타깃 네트워크, 옵티마이저 상태, epsilon, 진행 카운터를 담은 체크포인트 dict를 만듭니다.
+    observation에는 관측 인코더의 spec()을 담아 다른 인코딩으로 이어서 학습하는 것을 막습니다.
+    include_replay면 리플레이 버퍼 복사본도 "replay"에 담으며, writer가 별도의 압축 파일로 저장합니다.
+    """
+    snapshot = {
+        "format": CHECKPOINT_FORMAT,
+        **_to_cpu(agent.training_state()),
+        "observation": observation,
+        "counters": counters,
+        "saved_at": time.time(),
+    }
+    if include_replay:
+        snapshot["replay"] = agent.memory.state_dict()
+    return snapshot
+
+
+def load_checkpoint(path: str, map_location="cpu"):
+    """체크포인트를 읽습니다. 예전 형식(가중치 state_dict만 저장된 파일)도 같은 dict 형태로 맞춰 반환합니다."""
+    data = torch.load(path, map_location=map_location)
+    if "model_state_dict" not in data:
+        return {"format": 0, "model_state_dict": data}
+    return data
+
+
+def versions_dir(path: str):
+    return f"{os.path.splitext(path)[0]}.versions"
+
+
+def replay_path(path: str):
+    return f"{os.path.splitext(path)[0]}.replay.npz"
+
+
+def load_replay(path: str):
+    """모델 체크포인트 옆에 저장된 리플레이 버퍼 덤프를 읽습니다. 없으면 None."""
+    path = replay_path(path)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def _save_to_temp(directory: str, suffix: str, save):
+    """directory 안에 겹치지 않는 임시 파일을 만들어 save(f)로 쓰고 그 경로를 반환합니다. 실패하면 지웁니다."""
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            save(f)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return tmp
+
+
+class CheckpointWriter:
+    """
+    체크포인트를 백그라운드 스레드에서 저장합니다.
+    저장은 임시 파일에 쓴 뒤 rename으로 교체하므로 읽는 쪽이 반쯤 쓰인 파일을 볼 일이 없고,
+    min_interval초에 한 번(또는 성능이 좋아졌을 때)만 저장하며 버전별 사본은 keep개까지 보관합니다.
+    같은 모델을 여러 워커가 동시에 학습해도 되도록 임시 파일 이름은 mkstemp로 만들고,
+    버전 번호는 실제로 쓸 때 버전 파일을 O_EXCL로 만들어 할당합니다.
+    """
+
+    def __init__(self, path: str, min_interval: float = 30.0, keep: int = 5, on_saved=None):
+        self.path = path
+        # 저장이 끝난 뒤 (writer 스레드에서) on_saved(snapshot) 호출
+        self.on_saved = on_saved
+        self.min_interval = min_interval
+        self.keep = max(1, keep)
+        self.history_dir = versions_dir(path)
+        os.makedirs(self.history_dir, exist_ok=True)
+        # 마지막으로 저장을 마친 버전
+        self.version = None
+        self.best = None
+        # 저장 요청이 주기 제한으로 건너뛰어졌는지 (종료 시 마지막으로 한 번 저장할지 판단)
+        self.dirty = False
+        self._last_save = 0.0
+        self._pending = None
+        self._saved = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def request(self, make_snapshot, score=None, force=False):
+        """
+        저장 조건을 만족하면 make_snapshot()으로 스냅샷을 떠서 쓰기 대기열에 넣고 True를 반환합니다.
+        조건을 만족하지 않으면 False. 쓰기가 밀려 있으면 대기 중인 스냅샷을 최신 것으로 교체합니다.
+        실제로 저장된 버전 번호는 saved_versions()로 받습니다.
+        """
+        improved = score is not None and (self.best is None or score > self.best)
+        now = time.monotonic()
+        if not (force or improved or now - self._last_save >= self.min_interval):
+            self.dirty = True
+            return False
+        self.dirty = False
+        if improved:
+            self.best = score
+        self._last_save = now
+        snapshot = make_snapshot()
+        with self._cond:
+            self._pending = snapshot
+            self._cond.notify()
+        return True
+
+    def saved_versions(self):
+        """지난 호출 이후 저장을 마친 버전 번호 목록. 교체되어 쓰이지 않은 스냅샷은 번호를 받지 않습니다."""
+        with self._cond:
+            saved, self._saved = self._saved, []
+        return saved
+
+    def close(self):
+        """대기 중인 스냅샷까지 모두 쓴 뒤 스레드를 종료합니다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    return
+            try:
+                self._write(snapshot)
+            except Exception as e:
+                print(f"Checkpoint save failed: {e}", flush=True)
+
+    def _write(self, snapshot):
+        replay = snapshot.pop("replay", None)
+        if replay is not None:
+            tmp = _save_to_temp(os.path.dirname(self.path) or ".", ".replay.tmp",
+                                lambda f: np.savez_compressed(f, **replay))
+            os.replace(tmp, replay_path(self.path))
+
+        version, version_path = self._reserve_version()
+        snapshot["version"] = version
+        try:
+            tmp = _save_to_temp(self.history_dir, ".pth.tmp", lambda f: torch.save(snapshot, f))
+        except BaseException:
+            os.remove(version_path)
+            raise
+        os.replace(tmp, version_path)
+
+        # 최신 버전을 model_url 경로로 원자적으로 교체 (가능하면 하드 링크로 복사 없이).
+        # 버전 번호는 모든 writer에서 겹치지 않으므로 임시 이름도 겹치지 않음
+        tmp = f"{self.path}.{version:06d}.tmp"
+        try:
+            os.link(version_path, tmp)
+        except OSError:
+            shutil.copyfile(version_path, tmp)
+        os.replace(tmp, self.path)
+        self._prune()
+        self.version = version
+        with self._cond:
+            self._saved.append(version)
+        if self.on_saved is not None:
+            self.on_saved(snapshot)
+
+    def _reserve_version(self):
+        """기존 최대 버전 다음 번호의 빈 버전 파일을 O_EXCL로 만들어, 다른 프로세스와 번호가 겹치지 않게 합니다."""
+        version = max(self._versions(), default=0)
+        while True:
+            version += 1
+            version_path = os.path.join(self.history_dir, f"{version:06d}.pth")
+            try:
+                os.close(os.open(version_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue
+            return version, version_path
+
+    def _versions(self):
+        versions = []
+        for name in os.listdir(self.history_dir):
+            match = VERSION_PATTERN.match(name)
+            if match:
+                versions.append(int(match.group(1)))
+        return versions
+
+    def _prune(self):
+        for version in sorted(self._versions())[:-self.keep]:
+            try:
+                os.remove(os.path.join(self.history_dir, f"{version:06d}.pth"))
+            except FileNotFoundError:
+                # 같은 모델을 저장하는 다른 writer가 먼저 지움
+                pass
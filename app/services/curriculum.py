@@ -0,0 +1,168 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from app.schemas.curriculum import CurriculumSchema, StageEvaluation
+from app.services.evaluation import evaluator, Evaluator
+from app.services.job_scheduler import job_scheduler, JobScheduler, TrainingJob
+from app.services.policy_server import CheckpointNotFound
+
+
+class CurriculumRun:
+    """
+    서버에서 도는 커리큘럼 한 건.
+    stages는 {"name", "map_configs", "min_success_rate"} dict 목록이고, options는 CurriculumCreate의 나머지 설정입니다.
+    """
+
+    def __init__(self, user_id: str, model_config: dict, stages: list, options: dict):
+        self.run_id = f"cur_{uuid.uuid4().hex[:8]}"
+        self.user_id = user_id
+        self.model_config = model_config
+        self.model_id = model_config["model_id"]
+        self.stages = stages
+        self.options = options
+
+        self.status = "running"
+        self.stage_index = 0
+        self.rounds = 0
+        self.job = None
+        self.error = None
+        self.evaluations = []
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.task = None
+
+    @property
+    def active(self):
+        return self.status == "running"
+
+    def to_schema(self):
+        return CurriculumSchema(
+            run_id=self.run_id,
+            model_id=self.model_id,
+            user_id=self.user_id,
+            status=self.status,
+            stage_index=self.stage_index,
+            stage=self.stages[self.stage_index]["name"] if self.stage_index < len(self.stages) else None,
+            rounds=self.rounds,
+            current_job_id=self.job.job_id if self.job is not None and self.job.active else None,
+            error=self.error,
+            evaluations=self.evaluations,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+        )
+
+
+class CurriculumRunner:
+    """
+    평가 스윕을 단계 통과 기준으로 쓰는 커리큘럼 실행기.
+    단계의 모든 맵을 병렬로 평가해 통과하면 다음 단계로, 아니면 통과하지 못한 맵만 스케줄러로 학습시킨 뒤 다시 평가합니다.
+    """
+
+    def __init__(self, scheduler: JobScheduler, evaluator: Evaluator, history_size: int = 100):
+        self.scheduler = scheduler
+        self.evaluator = evaluator
+        self.history_size = history_size
+        self.runs = OrderedDict()
+
+    def start(self, run: CurriculumRun):
+        self.runs[run.run_id] = run
+        self._prune()
+        run.task = asyncio.create_task(self._run(run))
+        return run
+
+    def get(self, run_id: str):
+        return self.runs.get(run_id)
+
+    def list(self, user_id: str = None):
+        return [run for run in self.runs.values() if user_id is None or run.user_id == user_id]
+
+    def cancel(self, run_id: str):
+        run = self.runs.get(run_id)
+        if run is not None and run.active:
+            run.task.cancel()
+        return run
+
+    def shutdown(self):
+        for run in list(self.runs.values()):
+            self.cancel(run.run_id)
+
+    async def _run(self, run: CurriculumRun):
+        options = run.options
+        attempts = 0
+        try:
+            while run.stage_index < len(run.stages):
+                stage = run.stages[run.stage_index]
+                failing = await self._evaluate(run, stage)
+                if not failing:
+                    run.stage_index += 1
+                    attempts = 0
+                    continue
+                if run.rounds >= options["max_rounds"]:
+                    run.status, run.error = "failed", "max_rounds reached"
+                    return
+                if attempts >= options["max_attempts"] and run.stage_index > 0:
+                    # 이전 단계 맵을 한 번 복습한 뒤 현재 단계를 다시 시도
+                    await self._train(run, run.stages[run.stage_index - 1]["map_configs"])
+                    attempts = 0
+                    continue
+                await self._train(run, failing)
+                attempts += 1
+            run.status = "completed"
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            if run.job is not None:
+                self.scheduler.cancel(run.job.job_id)
+        except Exception as e:
+            run.status, run.error = "failed", str(e)
+        finally:
+            run.finished_at = datetime.now(timezone.utc)
+
+    async def _evaluate(self, run: CurriculumRun, stage: dict):
+        """단계의 모든 맵을 평가해 기록하고, 기준에 못 미친 맵의 설정 목록을 반환합니다."""
+        map_configs = stage["map_configs"]
+        try:
+            results = await self.evaluator.evaluate(run.model_config, map_configs,
+                                                    episodes=run.options["eval_episodes"],
+                                                    epsilon=run.options["eval_epsilon"])
+        except CheckpointNotFound:
+            # 아직 한 번도 저장되지 않은 모델은 평가 없이 모든 맵을 학습
+            return map_configs
+        failing = [config for config, result in zip(map_configs, results)
+                   if result["success_rate"] < stage["min_success_rate"]]
+        run.evaluations.append(StageEvaluation(
+            round=run.rounds,
+            stage=stage["name"],
+            passed=not failing,
+            success_rate=sum(r["success_rate"] for r in results) / len(results),
+            results=results,
+        ))
+        return failing
+
+    async def _train(self, run: CurriculumRun, map_configs: list):
+        # 모든 맵을 한 작업의 한 배치로 학습 (한도는 맵 수만큼 늘림)
+        n = len(map_configs)
+        train_seconds = run.options["train_seconds"]
+        run.job = self.scheduler.submit(TrainingJob(
+            user_id=run.user_id,
+            map_config=map_configs[0],
+            extra_map_configs=map_configs[1:],
+            model_config=run.model_config,
+            loop=True,
+            telemetry={"mode": "per_episode_summary"},
+            limits={"max_episodes": run.options["train_episodes"] * n,
+                    "max_seconds": None if train_seconds is None else train_seconds * n},
+        ))
+        await run.job.wait()
+        if run.job.status == "failed":
+            raise RuntimeError(f"Training job {run.job.job_id} failed: {run.job.error}")
+        run.rounds += 1
+
+    def _prune(self):
+        finished = [run_id for run_id, run in self.runs.items() if not run.active]
+        for run_id in finished[:max(0, len(self.runs) - self.history_size)]:
+            del self.runs[run_id]
+
+
+curriculum_runner = CurriculumRunner(job_scheduler, evaluator)
@@ -1,9 +1,11 @@
+import copy
 import numpy as np
 import random
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from collections import deque
+
+from app.services.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
 
 class DQN(nn.Module):
     def __init__(self, state_dim, action_dim):
@@ -20,20 +22,58 @@ class DQN(nn.Module):
         return self.fc(x)
 
 
+class GridDQN(nn.Module):
+    """격자 관측(GridEncoder)을 받는 CNN Q 네트워크. 입력은 (C, H, W)를 평탄화한 벡터입니다."""
+
+    def __init__(self, grid_size, action_dim, channels=5):
+        super().__init__()
+        self.grid_size = grid_size
+        self.channels = channels
+        self.conv = nn.Sequential(
+            nn.Conv2d(channels, 32, 3, padding=1), nn.ReLU(),
+            nn.Conv2d(32, 64, 3, stride=2, padding=1), nn.ReLU(),
+            nn.Conv2d(64, 64, 3, stride=2, padding=1), nn.ReLU(),
+            nn.AdaptiveAvgPool2d(4),
+        )
+        self.fc = nn.Sequential(
+            nn.Linear(64 * 4 * 4, 256), nn.ReLU(),
+            nn.Linear(256, action_dim)
+        )
+
+    def forward(self, x):
+        x = self.conv(x.view(-1, self.channels, self.grid_size, self.grid_size))
+        return self.fc(x.flatten(1))
+
+
+def build_network(model_type, state_dim, action_dim, grid_size=None):
+    """model_type이 cnn이면 GridDQN, 아니면 MLP DQN."""
+    if model_type == "cnn":
+        return GridDQN(grid_size, action_dim, channels=state_dim // (grid_size * grid_size))
+    return DQN(state_dim, action_dim)
+
+
 class DQNAgent:
     def __init__(
             self, action_dim, state_dim, device='cpu',
             learning_rate=1e-3, batch_size=64, gamma=0.99, epsilon_start=1.0,
-            epsilon_min=0.05, epsilon_decay=0.995, update_target_every=10
+            epsilon_min=0.05, epsilon_decay=0.995, update_target_every=10, replay_capacity=10000,
+            replay_type='uniform', priority_alpha=0.6, priority_beta=0.4,
+            train_every=1, gradient_steps=1, learning_starts=0, model_type='dqn', grid_size=None
     ):
-        # 상태 차원: x, y + 최대 비트 개수
+        # 상태 차원: 관측 인코더의 state_dim
         self.state_dim = state_dim
         self.action_dim = action_dim
         self.device = device
-        self.model = DQN(self.state_dim, action_dim).to(device)
-        self.target = DQN(self.state_dim, action_dim).to(device)
+        self.model = build_network(model_type, self.state_dim, action_dim, grid_size).to(device)
+        self.target = build_network(model_type, self.state_dim, action_dim, grid_size).to(device)
         self.target.load_state_dict(self.model.state_dict())
-        self.memory = deque(maxlen=10000)
+        self.prioritized = replay_type == 'prioritized'
+        if self.prioritized:
+            self.memory = PrioritizedReplayBuffer(
+                replay_capacity, self.state_dim, device, alpha=priority_alpha, beta=priority_beta
+            )
+        else:
+            self.memory = ReplayBuffer(replay_capacity, self.state_dim, device)
         self.optimizer = optim.Adam(self.model.parameters(), lr=learning_rate)
         self.batch_size = batch_size
         self.gamma = gamma
@@ -41,6 +81,11 @@ class DQNAgent:
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
         self.update_target_every = update_target_every
+        # train_every 스텝마다 gradient_steps번 업데이트, 버퍼가 learning_starts개 쌓이기 전에는 학습하지 않음
+        self.train_every = train_every
+        self.gradient_steps = gradient_steps
+        self.learning_starts = learning_starts
+        self.steps_since_train = 0
 
     def select_action(self, state):
         if np.random.rand() < self.epsilon:
@@ -50,33 +95,83 @@ class DQNAgent:
             qvals = self.model(state)
         return qvals.argmax().item()
 
+    def select_actions(self, states):
+        """K개의 상태에 대해 epsilon-greedy 행동을 한 번의 forward로 고릅니다."""
+        n = len(states)
+        explore = np.random.rand(n) < self.epsilon
+        actions = np.random.randint(self.action_dim, size=n)
+        if not explore.all():
+            states = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+            with torch.no_grad():
+                greedy = self.model(states).argmax(dim=1).cpu().numpy()
+            actions = np.where(explore, actions, greedy)
+        return actions
+
     def store(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done)
+
+    def store_batch(self, states, actions, rewards, next_states, dones):
+        self.memory.add_batch(states, actions, rewards, next_states, dones)
 
     def train_step(self):
         if len(self.memory) < self.batch_size:
             return None
-        batch = random.sample(self.memory, self.batch_size)
-        state, action, reward, next_state, done = map(np.array, zip(*batch))
-        state = torch.FloatTensor(state).to(self.device)
-        next_state = torch.FloatTensor(next_state).to(self.device)
-        action = torch.LongTensor(action).to(self.device)
-        reward = torch.FloatTensor(reward).to(self.device)
-        done = torch.FloatTensor(done.astype(np.float32)).to(self.device)
+        idx = self.memory.sample_indices(self.batch_size)
+        state, action, reward, next_state, done = self.memory.to_tensors(idx)
 
         qvals = self.model(state).gather(1, action.unsqueeze(1)).squeeze(1)
         with torch.no_grad():
             next_qvals = self.target(next_state).max(1)[0]
             target = reward + self.gamma * next_qvals * (1 - done)
-        loss = nn.MSELoss()(qvals, target)
+        if self.prioritized:
+            # importance-sampling 가중치를 곱한 MSE, 우선순위는 TD 오차로 한 번에 갱신
+            td_error = target - qvals
+            weights = torch.from_numpy(self.memory.importance_weights(idx)).to(self.device)
+            loss = (weights * td_error.pow(2)).mean()
+            self.memory.update_priorities(idx, td_error.detach().abs().cpu().numpy())
+        else:
+            loss = nn.MSELoss()(qvals, target)
 
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
         return loss.item()
 
+    def maybe_train(self):
+        """
+        환경 스텝마다 호출합니다(벡터 환경이면 배치 스텝마다 한 번).
+        train_every번째 호출에서만 gradient_steps번 train_step을 돌리고 평균 loss를 반환합니다.
+        """
+        self.steps_since_train += 1
+        if self.steps_since_train < self.train_every or len(self.memory) < self.learning_starts:
+            return None
+        self.steps_since_train = 0
+        losses = [loss for loss in (self.train_step() for _ in range(self.gradient_steps)) if loss is not None]
+        return sum(losses) / len(losses) if losses else None
+
     def update_epsilon(self):
         self.epsilon = max(self.epsilon * self.epsilon_decay, self.epsilon_min)
 
     def update_target_network(self):
         self.target.load_state_dict(self.model.state_dict())
+
+    def training_state(self):
+        """학습을 이어서 하기 위해 필요한 상태(가중치, 타깃, 옵티마이저, epsilon, 업데이트 카운터)."""
+        return {
+            "model_state_dict": self.model.state_dict(),
+            "target_state_dict": self.target.state_dict(),
+            "optimizer_state_dict": self.optimizer.state_dict(),
+            "epsilon": self.epsilon,
+            "steps_since_train": self.steps_since_train,
+        }
+
+    def load_training_state(self, state):
+        """training_state() 결과를 복원합니다. 가중치만 있는 예전 체크포인트는 가중치만 불러옵니다."""
+        self.model.load_state_dict(state["model_state_dict"])
+        self.target.load_state_dict(state.get("target_state_dict", state["model_state_dict"]))
+        if "optimizer_state_dict" in state:
+            # 옵티마이저는 같은 디바이스의 텐서를 복사 없이 가져다 쓰므로, 캐시된 체크포인트가 바뀌지 않게 복사본을 넘김
+            self.optimizer.load_state_dict(copy.deepcopy(state["optimizer_state_dict"]))
+        if "epsilon" in state:
+            self.epsilon = state["epsilon"]
+        self.steps_since_train = state.get("steps_since_train", 0)
@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+from app.core.config import settings
+from app.services.cache import get_map_solution
+from app.services.policy_server import get_policy
+from app.services.rl_environment import VectorGridEnv
+from app.services.solver import TabularAgent
+from app.services.solver import MapTooLarge
+from app.services.trainer import build_encoder, build_env
+
+
+def encode_actions(actions: np.ndarray):
+    """행동 배열을 uint8 바이트의 base64 문자열로 압축합니다 (행동 하나당 1바이트)."""
+    return base64.b64encode(np.asarray(actions, dtype=np.uint8).tobytes()).decode()
+
+
+def model_selector(policy, device: str):
+    def select(venv, states):
+        with torch.inference_mode():
+            return policy(torch.from_numpy(states).to(device)).argmax(dim=1).cpu().numpy()
+    return select
+
+
+def optimal_selector(solution):
+    agent = TabularAgent(solution)
+    return lambda venv, states: agent.select_actions(venv.cells, venv.collected, venv.current_step)
+
+
+def rollout(select, map_config: dict, episodes: int, epsilon: float, rng,
+            include_trajectories: bool, max_envs: int, encoder=None):
+    """
+    한 맵에서 episodes개의 에피소드를 가중치 갱신/리플레이 없이 실행합니다. select(venv, states)가 greedy 행동을 고릅니다.
+    에피소드를 최대 max_envs개씩 묶어 벡터 환경으로 동시에 진행하고, 묶음 안에서는 각 환경의 첫 에피소드만 집계합니다.
+    """
+    env = build_env(map_config, encoder)
+
+    returns, lengths, successes, trajectories = [], [], [], []
+    remaining = episodes
+    while remaining > 0:
+        k = min(remaining, max_envs)
+        remaining -= k
+        venv = VectorGridEnv(env, k)
+        states = venv.reset()
+        active = np.ones(k, dtype=bool)
+        total = np.zeros(k)
+        length = np.zeros(k, dtype=np.int64)
+        success = np.zeros(k, dtype=bool)
+        history = []
+        while active.any():
+            actions = select(venv, states)
+            if epsilon > 0:
+                explore = rng.random(k) < epsilon
+                actions = np.where(explore, rng.integers(venv.action_space.n, size=k), actions)
+            history.append(actions)
+            states, rewards, terminated, truncated, info = venv.step(actions)
+            total[active] += rewards[active]
+            length[active] += 1
+            success |= info["success"] & active
+            active &= ~(terminated | truncated)
+
+        returns.append(total)
+        lengths.append(length)
+        successes.append(success)
+        if include_trajectories:
+            history = np.stack(history, axis=1)
+            trajectories.extend(encode_actions(history[i, :length[i]]) for i in range(k))
+
+    returns, lengths, successes = np.concatenate(returns), np.concatenate(lengths), np.concatenate(successes)
+    return {
+        "map_id": map_config["map_id"],
+        "episodes": episodes,
+        "success_rate": float(successes.mean()),
+        "mean_return": float(returns.mean()),
+        "mean_steps": float(lengths.mean()),
+        "trajectories": trajectories if include_trajectories else None,
+    }
+
+
+def evaluate_policy(model_config: dict, map_configs: list, episodes: int = 1, epsilon: float = 0.0,
+                    include_trajectories: bool = False, seed: int = None, device: str = "cpu",
+                    policy: str = "model"):
+    """
+    학습된 모델(policy="model") 또는 정확한 해의 최적 정책(policy="optimal")으로 여러 맵을 평가합니다 (평가 워커 프로세스에서 실행).
+    epsilon=0이면 환경과 정책이 모두 결정적이므로 맵마다 한 에피소드만 실행합니다.
+    결과에는 비교 기준으로 최적 스텝 수와 최적 보상을 함께 담습니다.
+    """
+    network = encoder = None
+    if policy == "model":
+        network = get_policy(model_config["model_id"], model_config["model_url"], device)
+        encoder = build_encoder(model_config)
+        if network.state_dim != encoder.state_dim:
+            raise ValueError(f"Model expects {network.state_dim}-dim states, "
+                             f"its observation encoding produces {encoder.state_dim}")
+    rng = np.random.default_rng(seed)
+    runs = 1 if epsilon == 0 else episodes
+    results = []
+    for map_config in map_configs:
+        try:
+            solution = get_map_solution(map_config)
+            optimal_return = solution.optimal_return
+        except MapTooLarge:
+            # 상태 공간이 너무 큰 맵은 최적 기준선 없이 평가
+            solution = optimal_return = None
+        if network is not None:
+            select = model_selector(network, device)
+        elif solution is not None:
+            select = optimal_selector(solution)
+        else:
+            raise ValueError(f"Map {map_config['map_id']} is too large to solve exactly")
+        result = rollout(select, map_config, runs, epsilon, rng, include_trajectories,
+                         settings.EVALUATION_MAX_ENVS, encoder)
+        result["optimal_steps"] = solution.min_steps if solution is not None else None
+        result["optimal_return"] = optimal_return
+        results.append(result)
+    return results
+
+
+class Evaluator:
+    """평가를 학습과 별도의 프로세스 풀에서 실행합니다. 오래 도는 학습 작업이 워커를 모두 차지해도 평가는 바로 실행됩니다."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = None
+
+    def start(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def evaluate(self, model_config: dict, map_configs: list, seed: int = None, **options):
+        """맵 목록을 워커 수만큼 나눠 병렬로 평가하고, 결과를 map_configs 순서대로 반환합니다."""
+        self.start()
+        n = min(self.max_workers, len(map_configs))
+        chunks = [map_configs[i::n] for i in range(n)]
+        results = await asyncio.gather(*[
+            asyncio.wrap_future(self._pool.submit(evaluate_policy, model_config, chunk,
+                                                  seed=None if seed is None else seed + i, **options))
+            for i, chunk in enumerate(chunks)
+        ])
+        # chunks[i]는 i, i + n, i + 2n ... 번째 맵
+        ordered = [None] * len(map_configs)
+        for i, chunk_results in enumerate(results):
+            ordered[i::n] = chunk_results
+        return ordered
+
+
+evaluator = Evaluator(settings.EVALUATION_WORKERS)
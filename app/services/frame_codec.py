@@ -0,0 +1,47 @@
+import struct
+
+import numpy as np
+
+# 학습 스텝 기록 바이너리 프레임 (리틀 엔디언, struct-of-arrays)
+#
+#   header  : magic b"YTS1" | uint16 version | uint16 state_dim | uint32 count     (12 bytes)
+#   float32 : reward[count], total_reward[count], loss[count](None이면 NaN), epsilon[count],
+#             state[count * state_dim]
+#   uint32  : episode[count], step[count], success[count]
+#   uint8   : action[count], flags[count] (bit0 terminated, bit1 truncated)
+#
+# 4바이트 배열을 앞에 두어 브라우저에서도 Float32Array/Uint32Array로 바로 볼 수 있게 정렬을 맞춥니다.
+# 디코더는 test_client.py 옆의 frame_decoder.py에 있습니다.
+FRAME_MAGIC = b"YTS1"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<4sHHI")
+
+FLAG_TERMINATED = 1
+FLAG_TRUNCATED = 2
+
+
+def encode_step_frame(records: list) -> bytes:
+    """Telemetry 스텝 기록(dict) 리스트를 하나의 바이너리 프레임으로 인코딩합니다."""
+    count = len(records)
+    state_dim = len(records[0]["state"]) if count else 0
+
+    floats = np.empty((4, count), dtype="<f4")
+    floats[0] = [r["reward"] for r in records]
+    floats[1] = [r["total_reward"] for r in records]
+    floats[2] = [np.nan if r["loss"] is None else r["loss"] for r in records]
+    floats[3] = [r["epsilon"] for r in records]
+    states = np.asarray([r["state"] for r in records], dtype="<f4").reshape(count, state_dim)
+    ints = np.array([[r["episode"] for r in records],
+                     [r["step"] for r in records],
+                     [r["success"] for r in records]], dtype="<u4").reshape(3, count)
+    bytes_ = np.array([[r["action"] for r in records],
+                       [r["terminated"] * FLAG_TERMINATED | r["truncated"] * FLAG_TRUNCATED for r in records]],
+                      dtype=np.uint8).reshape(2, count)
+
+    return b"".join((
+        FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, state_dim, count),
+        floats.tobytes(),
+        states.tobytes(),
+        ints.tobytes(),
+        bytes_.tobytes(),
+    ))
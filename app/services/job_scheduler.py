@@ -0,0 +1,247 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import torch
+
+from app.core.config import settings
+from app.schemas.job import JobSchema
+from app.services.training_executor import training_executor, TrainingExecutor
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class TrainingJob:
+    """
+    스케줄러가 관리하는 학습 작업 한 건.
+    웹소켓은 작업의 시청자(viewer)로 붙어 이벤트를 받기만 하므로, 연결이 끊겨도 작업은 계속됩니다.
+    """
+
+    def __init__(self, user_id: str, map_config: dict, model_config: dict, loop: bool,
+                 telemetry: dict, limits: dict, cancel_on_detach: bool = False, extra_map_configs: list = None):
+        self.job_id = f"job_{uuid.uuid4().hex[:8]}"
+        self.user_id = user_id
+        self.map_config = map_config
+        self.model_config = model_config
+        self.model_id = model_config["model_id"]
+        self.map_id = map_config["map_id"]
+        # map_config와 같은 배치에서 함께 학습할 맵들
+        self.extra_map_configs = extra_map_configs or []
+        self.loop = loop
+        self.telemetry = telemetry
+        self.limits = limits
+        # 웹소켓 라우트가 만든 작업은 마지막 시청자가 떠나면 취소
+        self.cancel_on_detach = cancel_on_detach
+
+        self.status = "queued"
+        self.device = None
+        self.session = None
+        self.episodes = 0
+        self.success = 0
+        self.stop_reason = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.viewers = set()
+        self.done = asyncio.Event()
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATUSES
+
+    def attach(self, maxsize: int = 1000):
+        viewer = asyncio.Queue(maxsize=maxsize)
+        self.viewers.add(viewer)
+        return viewer
+
+    def detach(self, viewer):
+        self.viewers.discard(viewer)
+        return not self.viewers
+
+    def publish(self, event):
+        """모든 시청자에게 이벤트를 전달합니다. 느린 시청자의 큐가 차면 그 시청자에게는 이벤트를 버립니다."""
+        for viewer in self.viewers:
+            try:
+                viewer.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+    def track(self, event):
+        """워커 이벤트에서 진행 상황(에피소드/성공 수)을 갱신합니다."""
+        kind = event["event"]
+        if kind == "episode":
+            self.episodes = max(self.episodes, event["episode"] + 1)
+            self.success = event["success"]
+        elif kind in ("step", "steps"):
+            record = event["records"][-1] if kind == "steps" else event
+            self.episodes = max(self.episodes, record["episode"])
+            self.success = record["success"]
+
+    async def wait(self):
+        """작업이 끝날 때까지 기다립니다 (시청자 큐와 달리 이벤트가 버려질 일이 없음)."""
+        await self.done.wait()
+
+    def to_schema(self, queue_position=None):
+        return JobSchema(
+            job_id=self.job_id,
+            model_id=self.model_id,
+            map_id=self.map_id,
+            extra_map_ids=[config["map_id"] for config in self.extra_map_configs],
+            user_id=self.user_id,
+            status=self.status,
+            device=self.device,
+            queue_position=queue_position,
+            episodes=self.episodes,
+            success=self.success,
+            stop_reason=self.stop_reason,
+            error=self.error,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+class JobScheduler:
+    """
+    학습 작업 큐와 스케줄러.
+    디바이스마다 동시에 실행할 작업 수를 제한하고, 대기 중인 작업은 실행 중인 작업이 가장 적은 사용자부터 꺼냅니다.
+    """
+
+    def __init__(self, executor: TrainingExecutor, devices: list, max_jobs_per_device: int,
+                 checkpoint: dict = None, history_size: int = 1000):
+        self.executor = executor
+        self.checkpoint = checkpoint
+        self.devices = devices
+        self.max_jobs_per_device = max_jobs_per_device
+        self.history_size = history_size
+        self.jobs = OrderedDict()
+        self.queue = []
+        self.running = {device: set() for device in devices}
+
+    def submit(self, job: TrainingJob):
+        self.jobs[job.job_id] = job
+        self.queue.append(job)
+        self._prune()
+        self._schedule()
+        return job
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def list(self, user_id: str = None):
+        return [job for job in self.jobs.values() if user_id is None or job.user_id == user_id]
+
+    def find_active(self, model_id: str, map_id: str):
+        for job in self.jobs.values():
+            if job.active and job.model_id == model_id and job.map_id == map_id:
+                return job
+        return None
+
+    def queue_position(self, job: TrainingJob):
+        return self.queue.index(job) if job in self.queue else None
+
+    def schema(self, job: TrainingJob):
+        return job.to_schema(self.queue_position(job))
+
+    def cancel(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if job is None or not job.active:
+            return job
+        if job.status == "queued":
+            self.queue.remove(job)
+            self._finish(job, "cancelled")
+        else:
+            job.stop_reason = "cancelled"
+            job.session.stop()
+        return job
+
+    def detach(self, job: TrainingJob, viewer):
+        if job.detach(viewer) and job.cancel_on_detach:
+            self.cancel(job.job_id)
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            self.cancel(job.job_id)
+
+    def _running_count(self, user_id=None):
+        return sum(1 for jobs in self.running.values() for job in jobs if user_id is None or job.user_id == user_id)
+
+    def _next_job(self):
+        # 공정 분배: 실행 중인 작업이 가장 적은 사용자의 가장 오래된 대기 작업
+        running_by_user = {}
+        for job in self.queue:
+            running_by_user.setdefault(job.user_id, self._running_count(job.user_id))
+        return min(self.queue, key=lambda job: running_by_user[job.user_id])
+
+    def _free_device(self):
+        free = [d for d in self.devices if len(self.running[d]) < self.max_jobs_per_device]
+        return min(free, key=lambda d: len(self.running[d])) if free else None
+
+    def _schedule(self):
+        while self.queue and self._running_count() < self.executor.max_workers:
+            device = self._free_device()
+            if device is None:
+                break
+            job = self._next_job()
+            self.queue.remove(job)
+            self.running[device].add(job)
+            job.device = device
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            job.session = self.executor.submit(job.map_config, job.model_config, loop=job.loop,
+                                               telemetry=job.telemetry, device=device, limits=job.limits,
+                                               checkpoint=self.checkpoint, extra_map_configs=job.extra_map_configs)
+            job.publish({"event": "job_started", "job_id": job.job_id, "device": device})
+            asyncio.create_task(self._run(job))
+
+    async def _run(self, job: TrainingJob):
+        status = "completed"
+        try:
+            async for event in job.session.events():
+                job.track(event)
+                if event["event"] == "error":
+                    status, job.error = "failed", event["detail"]
+                job.publish(event)
+            if status == "completed" and not job.session.future.cancelled():
+                result = job.session.future.result()
+                job.episodes, job.success = result["episodes"], result["success"]
+                if job.stop_reason is None:
+                    job.stop_reason = result["reason"]
+                if job.stop_reason == "cancelled":
+                    status = "cancelled"
+        except Exception as e:
+            status, job.error = "failed", str(e)
+        finally:
+            self.running[job.device].discard(job)
+            self._finish(job, status)
+            self._schedule()
+
+    def _finish(self, job: TrainingJob, status: str):
+        job.status = status
+        job.finished_at = datetime.now(timezone.utc)
+        job.publish({"event": "job_finished", **self.schema(job).model_dump(mode="json")})
+        job.publish(None)
+        job.done.set()
+
+    def _prune(self):
+        # 끝난 작업은 history_size개까지만 보관
+        finished = [job_id for job_id, job in self.jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(self.jobs) - self.history_size)]:
+            del self.jobs[job_id]
+
+
+def detect_devices():
+    """TRAINING_DEVICES 설정(쉼표 구분)이 없으면 GPU별 cuda:i, GPU가 없으면 cpu 하나를 사용합니다."""
+    if settings.TRAINING_DEVICES:
+        return [d.strip() for d in settings.TRAINING_DEVICES.split(",") if d.strip()]
+    if torch.cuda.is_available():
+        return [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+    return ["cpu"]
+
+
+job_scheduler = JobScheduler(
+    training_executor, detect_devices(), settings.MAX_JOBS_PER_DEVICE,
+    checkpoint={"min_interval": settings.CHECKPOINT_MIN_INTERVAL, "keep": settings.CHECKPOINT_KEEP},
+)
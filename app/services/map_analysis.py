@@ -0,0 +1,93 @@
+from collections import Counter
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.rl_environment import CompiledMap, CELL_GOAL, CELL_TRAP, CELL_WALL
+from app.services.solver import MAX_SOLVER_STATES, MapTooLarge, solve_map
+
+
+def reachable_cells(compiled: CompiledMap, start_cell: int):
+    """시작 셀에서 이동으로 닿을 수 있는 셀 (flood fill). 함정은 밟으면 끝나므로 그 너머로는 퍼지지 않습니다."""
+    seen = np.zeros(compiled.n_cells, dtype=bool)
+    seen[start_cell] = True
+    frontier = np.array([start_cell])
+    while len(frontier):
+        frontier = frontier[(compiled.cell_type[frontier] & CELL_TRAP) == 0]
+        nxt = np.unique(compiled.next_cell[frontier].ravel())
+        nxt = nxt[~seen[nxt]]
+        seen[nxt] = True
+        frontier = nxt
+    return seen
+
+
+def analyze_map(map_config: dict, max_states: int = None):
+    """
+    맵을 학습에 쓰기 전에 검사합니다. MapConfig.model_dump() 형태의 dict를 받아
+    {"solvable", "min_steps", "issues"}를 반환하며, issues에는 풀 수 없거나 의심스러운 이유가 코드로 담깁니다.
+    생성/수정 요청마다 실행되므로 정확한 해는 상태 수가 max_states(기본 MAP_ANALYSIS_MAX_STATES) 이하일 때만 구합니다.
+    그 이하면 solvable은 모든 비트를 먹고 max_steps 안에 출구에 도달할 수 있을 때만 True 이고,
+    넘으면 flood fill로 출구/비트에 닿는지만 보며 min_steps는 None 입니다.
+    """
+    if max_states is None:
+        max_states = settings.MAP_ANALYSIS_MAX_STATES
+    compiled = CompiledMap.from_config(map_config)
+    issues = []
+
+    def cell_of(pos, name):
+        if not compiled.in_grid(pos["x"], pos["y"]):
+            issues.append(f"{name}_outside_grid")
+            return None
+        cell = compiled.cell_of(pos["x"], pos["y"])
+        if compiled.cell_type[cell] & CELL_WALL:
+            issues.append(f"{name}_on_wall")
+        return cell
+
+    start = cell_of(map_config["agent_pos"], "start")
+    if start is not None and compiled.cell_type[start] & CELL_TRAP:
+        issues.append("start_on_trap")
+    exit_cell = cell_of(map_config["exit_pos"], "exit")
+    bits = map_config["bit_list"]
+    bit_cells = [cell_of(bit, "bit") for bit in bits]
+    if any(count > 1 for count in Counter((bit["x"], bit["y"]) for bit in bits).values()):
+        issues.append("duplicate_bit")
+    if any(cell is not None and compiled.cell_type[cell] & CELL_TRAP for cell in bit_cells):
+        issues.append("bit_on_trap")
+
+    if start is not None:
+        reachable = reachable_cells(compiled, start)
+        if exit_cell is not None and not reachable[exit_cell]:
+            issues.append("exit_unreachable")
+        if any(cell is not None and not reachable[cell] for cell in bit_cells):
+            issues.append("bit_unreachable")
+
+    try:
+        solution = solve_map(map_config, compiled, max_states=max_states)
+        reachable, solvable, min_steps = solution.reachable, solution.solvable, solution.min_steps
+    except MapTooLarge:
+        # 정확한 해는 구하지 않고 flood fill 결과로만 판단 (최소 스텝 수는 모름).
+        # /solution에서도 풀 수 없는 크기일 때만 문제로 기록
+        if compiled.n_cells << compiled.n_bits > MAX_SOLVER_STATES:
+            issues.append("too_large_to_solve")
+        reachable = solvable = start is not None and _all_reachable(compiled, start)
+        min_steps = None
+    if reachable and not solvable:
+        issues.append("max_steps_too_small")
+    elif not reachable and not issues:
+        issues.append("unreachable")
+    # 벽 위에서 시작/끝나는 맵은 경로가 있어도 잘못된 맵으로 봄
+    invalid = any(issue in ("start_on_wall", "exit_on_wall") for issue in issues)
+    return {
+        "solvable": solvable and not invalid,
+        "min_steps": min_steps,
+        "issues": sorted(set(issues)),
+    }
+
+
+def _all_reachable(compiled: CompiledMap, start_cell: int):
+    """출구와 모든 비트 칸이 시작 셀에서 닿는지. 함정 위 비트는 먹는 순간 끝나므로 닿지 않는 것으로 봅니다."""
+    reachable = reachable_cells(compiled, start_cell)
+    goals = np.flatnonzero(compiled.cell_type & CELL_GOAL)
+    bits = compiled.bit_cells
+    return (len(goals) > 0 and bool(reachable[goals].all()) and bool(reachable[bits].all())
+            and not (compiled.cell_type[bits] & CELL_TRAP).any())
@@ -0,0 +1,170 @@
+import os
+import tempfile
+from typing import AsyncIterator
+
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow가 없으면 원본만 저장하고 변환은 건너뜀
+    Image = None
+
+# 원본 외에 백그라운드에서 만드는 WebP 변환본: 이름 -> 긴 변의 최대 픽셀 수 (None이면 원본 크기)
+VARIANTS = {"webp": None, "thumb": 256}
+
+
+# multipart 경계/헤더 등 파일 외 부분에 허용하는 여유 바이트
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class InvalidUpload(ValueError):
+    pass
+
+
+def variant_path(image_path: str, variant: str):
+    """원본 경로(map_xxx.png)에 대한 변환본 경로 (map_xxx.webp, map_xxx_thumb.webp)."""
+    stem = os.path.splitext(image_path)[0]
+    return f"{stem}.webp" if variant == "webp" else f"{stem}_{variant}.webp"
+
+
+def _open_temp(directory: str):
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(fd, "wb"), tmp_path
+
+
+def _discard(buffer, tmp_path: str):
+    buffer.close()
+    os.remove(tmp_path)
+
+
+def _commit(buffer, tmp_path: str, path: str):
+    buffer.close()
+    os.replace(tmp_path, path)
+    # 예전 이미지로 만든 변환본은 새로 만들 때까지 내리지 않도록 지움
+    for variant in VARIANTS:
+        try:
+            os.remove(variant_path(path, variant))
+        except FileNotFoundError:
+            pass
+
+
+class _FilePart:
+    """MultipartParser 콜백으로 field 이름의 파트 데이터만 pending에 모읍니다."""
+
+    def __init__(self, field: str):
+        self.field = field.encode()
+        self.pending = []
+        self.pending_bytes = 0
+        self.found = False
+        self._in_field = False
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_part_begin(self):
+        self._in_field = False
+
+    def on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(self._header_value)
+            if options.get(b"name") == self.field and b"filename" in options:
+                self._in_field = self.found = True
+        self._header_field = self._header_value = b""
+
+    def on_part_data(self, data, start, end):
+        if self._in_field:
+            self.pending.append(data[start:end])
+            self.pending_bytes += end - start
+
+    def callbacks(self):
+        return {name: getattr(self, name) for name in (
+            "on_part_begin", "on_header_field", "on_header_value", "on_header_end", "on_part_data")}
+
+
+async def save_upload(chunks: AsyncIterator[bytes], content_type: str, path: str, max_bytes: int,
+                      chunk_size: int, field: str = "file"):
+    """
+    multipart/form-data 요청 본문(request.stream())을 받는 대로 파싱해 field 파일 파트만 같은 디렉터리의 임시 파일에 쓰고,
+    끝나면 path로 rename합니다. 본문 전체를 먼저 받아 두지 않으므로 Content-Length가 없는(chunked) 요청도
+    max_bytes(파일 외 부분은 MULTIPART_OVERHEAD_BYTES까지)를 넘는 순간 읽기를 멈추고 UploadTooLarge 입니다.
+    파일 쓰기는 chunk_size 이상 모일 때마다 스레드 풀에서 실행합니다. 형식이 잘못되면 InvalidUpload.
+    저장한 바이트 수를 반환합니다.
+    """
+    media_type, options = parse_options_header(content_type)
+    if media_type != b"multipart/form-data" or b"boundary" not in options:
+        raise InvalidUpload("Expected a multipart/form-data body")
+    part = _FilePart(field)
+    parser = MultipartParser(options[b"boundary"], part.callbacks())
+
+    buffer, tmp_path = await run_in_threadpool(_open_temp, os.path.dirname(path) or ".")
+    size = received = 0
+
+    async def flush():
+        nonlocal size
+        data = b"".join(part.pending)
+        part.pending.clear()
+        part.pending_bytes = 0
+        size += len(data)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        await run_in_threadpool(buffer.write, data)
+
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > max_bytes + MULTIPART_OVERHEAD_BYTES:
+                raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+            try:
+                parser.write(chunk)
+            except ValueError as e:
+                raise InvalidUpload(f"Malformed multipart body: {e}")
+            if part.pending_bytes >= chunk_size or size + part.pending_bytes > max_bytes:
+                await flush()
+        try:
+            parser.finalize()
+        except ValueError as e:
+            raise InvalidUpload(f"Malformed multipart body: {e}")
+        await flush()
+        if not part.found:
+            raise InvalidUpload(f"Missing file field '{field}'")
+    except BaseException:
+        await run_in_threadpool(_discard, buffer, tmp_path)
+        raise
+    await run_in_threadpool(_commit, buffer, tmp_path, path)
+    return size
+
+
+def make_variants(path: str):
+    """
+    원본 이미지로 WebP 변환본(VARIANTS)을 만듭니다. BackgroundTasks에서 스레드 풀로 실행됩니다.
+    Pillow가 없거나 이미지를 읽을 수 없으면 아무것도 만들지 않고, 만든 변환본 이름 목록을 반환합니다.
+    """
+    if Image is None:
+        return []
+    made = []
+    try:
+        with Image.open(path) as image:
+            image.load()
+            for variant, max_side in VARIANTS.items():
+                resized = image.copy() if image.mode in ("RGB", "RGBA") else image.convert("RGBA")
+                if max_side is not None:
+                    resized.thumbnail((max_side, max_side))
+                target = variant_path(path, variant)
+                tmp_path = f"{target}.part"
+                resized.save(tmp_path, "WEBP")
+                os.replace(tmp_path, target)
+                made.append(variant)
+    except (OSError, ValueError) as e:
+        print(f"Map image variants failed for {path}: {e}", flush=True)
+    return made
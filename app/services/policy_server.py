@@ -0,0 +1,162 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from app.core.config import settings
+from app.services.cache import checkpoint_key, get_checkpoint, get_compiled_map, policy_cache
+from app.services.dqn_agent import DQN, GridDQN
+
+
+class CheckpointNotFound(LookupError):
+    pass
+
+
+def build_policy(checkpoint: dict, device: str):
+    """
+    체크포인트 가중치 모양에서 입력/행동 차원을 읽어 추론용 네트워크를 만듭니다.
+    CNN(GridDQN)은 가중치로 격자 크기를 알 수 없으므로 체크포인트에 저장된 관측 spec을 씁니다.
+    """
+    state_dict = checkpoint["model_state_dict"]
+    weights = [value for key, value in state_dict.items() if key.endswith("weight")]
+    if "conv.0.weight" in state_dict:
+        observation = checkpoint["observation"]
+        policy = GridDQN(observation["grid_size"], weights[-1].shape[0], channels=weights[0].shape[1])
+        policy.state_dim = observation["state_dim"]
+    else:
+        policy = DQN(weights[0].shape[1], weights[-1].shape[0])
+        policy.state_dim = weights[0].shape[1]
+    policy.load_state_dict(state_dict)
+    return policy.to(device).eval()
+
+
+def get_policy(model_id: str, path: str, device: str):
+    key = checkpoint_key(model_id, path)
+    if key is None:
+        raise CheckpointNotFound(f"Checkpoint not found for {model_id}")
+    return policy_cache.get_or_create(
+        key + (device,), lambda: build_policy(get_checkpoint(model_id, path), device))
+
+
+def encode_map_states(encoder, map_configs: dict, map_states: list):
+    """
+    맵 위의 상태({"map_id", "agent_pos", "collected"} dict 목록)를 encoder로 관측 벡터 (N, state_dim)로 바꿉니다.
+    map_configs는 map_id -> MapSchema.model_dump() 이며, 맵마다 캐시된 CompiledMap에 인코더를 한 번 bind해 한꺼번에 변환합니다.
+    격자 밖 위치나 비트가 없는 칸을 collected로 주면 ValueError.
+    """
+    states = np.zeros((len(map_states), encoder.state_dim), dtype=np.float32)
+    rows_by_map = {}
+    for row, state in enumerate(map_states):
+        rows_by_map.setdefault(state["map_id"], []).append(row)
+    for map_id, rows in rows_by_map.items():
+        compiled = get_compiled_map(map_configs[map_id])
+        encode = encoder.bind(compiled)
+        cells = np.zeros(len(rows), dtype=np.int64)
+        collected = np.zeros((len(rows), compiled.n_bits), dtype=bool)
+        for i, row in enumerate(rows):
+            pos = map_states[row]["agent_pos"]
+            if not compiled.in_grid(pos["x"], pos["y"]):
+                raise ValueError(f"Agent position ({pos['x']}, {pos['y']}) is outside map {map_id}")
+            cells[i] = compiled.cell_of(pos["x"], pos["y"])
+            for bit in map_states[row]["collected"]:
+                bit_index = (compiled.bit_index[compiled.cell_of(bit["x"], bit["y"])]
+                             if compiled.in_grid(bit["x"], bit["y"]) else -1)
+                if bit_index < 0:
+                    raise ValueError(f"No bit at ({bit['x']}, {bit['y']}) on map {map_id}")
+                collected[i, bit_index] = True
+        states[rows] = encode(cells, collected)
+    return states
+
+
+class PolicyServer:
+    """
+    학습된 DQN으로 greedy 행동과 Q값을 계산하는 추론 서버.
+    같은 모델에 대한 요청은 max_wait초 동안(또는 max_batch행이 찰 때까지) 모아 한 번의 forward로 처리하며,
+    forward는 전용 스레드 하나에서 실행되어 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, device: str = "cpu", max_batch: int = 1024, max_wait: float = 0.005):
+        self.device = device
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        # (model_id, path, state_dim) -> [(states, future), ...]
+        self._pending = {}
+        self._timers = {}
+        # 이벤트 루프는 태스크를 약하게만 참조하므로, 실행 중인 배치가 GC되지 않도록 여기서 잡아 둠
+        self._tasks = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy")
+
+    async def q_values(self, model_id: str, path: str, states) -> np.ndarray:
+        """states (N, state_dim)에 대한 Q값 (N, action_dim)."""
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim != 2:
+            raise ValueError("states must be a 2-D array")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # 상태 차원이 다른 요청은 다른 배치로 모아 잘못된 요청이 다른 요청을 실패시키지 않게 함
+        key = (model_id, path, states.shape[1])
+        items = self._pending.setdefault(key, [])
+        items.append((states, future))
+        if sum(len(s) for s, _ in items) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    async def act(self, model_id: str, path: str, states):
+        q = await self.q_values(model_id, path, states)
+        return q.argmax(axis=1), q
+
+    def shutdown(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        # 아직 배치로 보내지 않은 요청과 실행 중인 배치의 호출자가 영원히 기다리지 않도록 취소
+        for items in self._pending.values():
+            for _, future in items:
+                future.cancel()
+        self._pending.clear()
+        for task in self._tasks:
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(key, None)
+        if items:
+            task = asyncio.ensure_future(self._run(key, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key, items):
+        model_id, path, _ = key
+        batch = np.concatenate([states for states, _ in items])
+        try:
+            q = await asyncio.get_running_loop().run_in_executor(self._executor, self._forward, model_id, path, batch)
+        except asyncio.CancelledError:
+            for _, future in items:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for states, future in items:
+            if not future.done():
+                future.set_result(q[offset:offset + len(states)])
+            offset += len(states)
+
+    def _forward(self, model_id: str, path: str, batch: np.ndarray):
+        policy = get_policy(model_id, path, self.device)
+        if batch.shape[1] != policy.state_dim:
+            raise ValueError(f"State must have {policy.state_dim} values, got {batch.shape[1]}")
+        with torch.inference_mode():
+            return policy(torch.from_numpy(batch).to(self.device)).cpu().numpy()
+
+
+policy_server = PolicyServer(settings.POLICY_DEVICE, settings.POLICY_MAX_BATCH, settings.POLICY_MAX_WAIT_MS / 1000)
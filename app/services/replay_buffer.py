@@ -0,0 +1,190 @@
+import numpy as np
+import torch
+
+
+class ReplayBuffer:
+    """
+    미리 할당한 연속 NumPy 배열 기반의 링 버퍼.
+    한 행에 [state, action, reward, next_state, done]을 float32로 나란히 저장하므로
+    샘플링은 인덱스 한 번으로 행을 모으고, 디바이스 전송도 배치당 한 번이면 됩니다.
+    """
+
+    def __init__(self, capacity: int, state_dim: int, device='cpu'):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.device = device
+        # 열 배치: state | action | reward | next_state | done
+        self._action = state_dim
+        self._reward = state_dim + 1
+        self._next_state = state_dim + 2
+        self._done = 2 * state_dim + 2
+        self.storage = np.zeros((capacity, 2 * state_dim + 3), dtype=np.float32)
+        self.pos = 0
+        self.size = 0
+        self._pin = torch.device(device).type == 'cuda'
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        row = self.storage[self.pos]
+        row[:self._action] = state
+        row[self._action] = action
+        row[self._reward] = reward
+        row[self._next_state:self._done] = next_state
+        row[self._done] = done
+        self.pos = (self.pos + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        n = len(states)
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.storage[idx, :self._action] = states
+        self.storage[idx, self._action] = actions
+        self.storage[idx, self._reward] = rewards
+        self.storage[idx, self._next_state:self._done] = next_states
+        self.storage[idx, self._done] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample_indices(self, batch_size: int):
+        return np.random.randint(0, self.size, size=batch_size)
+
+    def to_tensors(self, idx):
+        """idx 행들을 한 번에 디바이스로 옮긴 뒤 (state, action, reward, next_state, done) 텐서로 나눕니다."""
+        batch = torch.from_numpy(self.storage[idx])
+        if self._pin:
+            batch = batch.pin_memory()
+        batch = batch.to(self.device, non_blocking=True)
+        state = batch[:, :self._action]
+        action = batch[:, self._action].long()
+        reward = batch[:, self._reward]
+        next_state = batch[:, self._next_state:self._done]
+        done = batch[:, self._done]
+        return state, action, reward, next_state, done
+
+    def sample(self, batch_size: int):
+        return self.to_tensors(self.sample_indices(batch_size))
+
+    def _chronological(self):
+        # 오래된 전이부터 순서대로의 행 인덱스
+        if self.size < self.capacity:
+            return np.arange(self.size)
+        return (self.pos + np.arange(self.capacity)) % self.capacity
+
+    def state_dict(self):
+        """저장된 전이를 오래된 순서로 복사해 반환합니다(용량이 바뀌어도 복원할 수 있도록)."""
+        return {"storage": self.storage[self._chronological()]}
+
+    def load_state_dict(self, state):
+        rows = state["storage"]
+        if rows.shape[1] != self.storage.shape[1]:
+            raise ValueError("Replay buffer state_dim does not match")
+        rows = rows[-self.capacity:]
+        n = len(rows)
+        self.storage[:n] = rows
+        self.size = n
+        self.pos = n % self.capacity
+        return rows
+
+
+class SumTree:
+    """
+    배열 기반 합 트리. 리프 i의 값이 우선순위이고 내부 노드는 자식의 합입니다.
+    갱신과 검색 모두 인덱스 배열 단위로 한 번에 처리합니다(레벨당 한 번의 벡터 연산, O(log n)).
+    """
+
+    def __init__(self, capacity: int):
+        self.leaf_offset = 1
+        while self.leaf_offset < capacity:
+            self.leaf_offset *= 2
+        self.depth = self.leaf_offset.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def leaves(self, idx):
+        return self.tree[idx + self.leaf_offset]
+
+    def update(self, idx, values):
+        nodes = np.asarray(idx) + self.leaf_offset
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """누적합이 values에 해당하는 리프 인덱스들을 찾습니다."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            go_right = values > left
+            values -= np.where(go_right, left, 0.0)
+            nodes = 2 * nodes + go_right
+        return nodes - self.leaf_offset
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    TD 오차 기반 우선순위 리플레이(PER).
+    샘플 확률은 priority^alpha에 비례하고, 편향 보정용 importance-sampling 가중치의 beta는 1까지 점차 증가합니다.
+    """
+
+    def __init__(self, capacity: int, state_dim: int, device='cpu',
+                 alpha=0.6, beta=0.4, beta_increment=1e-4, eps=1e-5):
+        super().__init__(capacity, state_dim, device)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.eps = eps
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    def add(self, state, action, reward, next_state, done):
+        # 새 전이는 최소 한 번은 뽑히도록 현재 최대 우선순위로 넣음
+        self.tree.update([self.pos], self.max_priority ** self.alpha)
+        super().add(state, action, reward, next_state, done)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        idx = (self.pos + np.arange(len(states))) % self.capacity
+        self.tree.update(idx, self.max_priority ** self.alpha)
+        super().add_batch(states, actions, rewards, next_states, dones)
+
+    def sample_indices(self, batch_size: int):
+        # 구간을 batch_size개로 나눠 구간마다 하나씩 뽑는 층화 샘플링
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + np.random.rand(batch_size)) * segment
+        return np.clip(self.tree.find(values), 0, self.size - 1)
+
+    def importance_weights(self, idx):
+        probs = self.tree.leaves(idx) / self.tree.total
+        weights = (self.size * np.maximum(probs, 1e-12)) ** -self.beta
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return (weights / weights.max()).astype(np.float32)
+
+    def state_dict(self):
+        state = super().state_dict()
+        state["priorities"] = self.tree.leaves(self._chronological())
+        state["max_priority"] = np.float64(self.max_priority)
+        state["beta"] = np.float64(self.beta)
+        return state
+
+    def load_state_dict(self, state):
+        rows = super().load_state_dict(state)
+        self.tree = SumTree(self.capacity)
+        if "priorities" in state:
+            self.tree.update(np.arange(len(rows)), state["priorities"][-len(rows):])
+            self.max_priority = float(state["max_priority"])
+            self.beta = float(state["beta"])
+        else:
+            # 균등 리플레이에서 저장된 버퍼면 모두 같은 우선순위로 시작
+            self.tree.update(np.arange(len(rows)), self.max_priority ** self.alpha)
+        return rows
+
+    def update_priorities(self, idx, td_errors):
+        priorities = np.abs(td_errors) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities ** self.alpha)
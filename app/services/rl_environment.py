@@ -1,10 +1,9 @@
 import gym
 from gym import spaces
 import numpy as np
-from typing import List
-from IPython.display import clear_output
+from typing import List, Literal
 
-MAX_BITS = 3  # 최대 비트 개수
+MAX_BITS = 3  # 기본 관측 비트 칸 수 (xy_bits 인코딩), 비트 보상 계산의 최소 기준
 
 class Size:
     def __init__(self, width: int, height: int):
@@ -29,8 +28,283 @@ class GridPosition:
     def __hash__(self):
         return hash((self.x, self.y))
 
+
+# 셀 타입 비트 플래그 (한 셀이 함정이면서 골일 수도 있으므로 플래그로 표현)
+CELL_EMPTY = 0
+CELL_WALL = 1
+CELL_TRAP = 2
+CELL_GOAL = 4
+CELL_BIT = 8
+
+# 행동 인덱스별 (dx, dy): 왼쪽, 오른쪽, 위, 아래
+ACTION_DELTAS = np.array([[-1, 0], [1, 0], [0, 1], [0, -1]], dtype=np.int64)
+
+
+class CompiledMap:
+    """
+    맵을 셀 인덱스(cell = yi * width + xi) 기반의 배열로 컴파일한 결과.
+    cell_type[cell]: CELL_* 플래그, bit_index[cell]: 비트 번호(-1이면 없음),
+    next_cell[cell, action]: 이동 결과 셀(벽/범위 밖이면 제자리)
+    비트 번호는 맵 안의 서로 다른 비트 칸에 목록 순서대로 0..n_bits-1을 매기며, 개수 제한은 없습니다.
+    """
+
+    def __init__(self, x_min: int, x_max: int, y_min: int, y_max: int,
+                 walls: List[GridPosition], traps: List[GridPosition], bits: List[GridPosition],
+                 goal: GridPosition):
+        self.x_min, self.x_max = x_min, x_max
+        self.y_min, self.y_max = y_min, y_max
+        self.width = x_max - x_min + 1
+        self.height = y_max - y_min + 1
+        self.n_cells = self.width * self.height
+
+        self.goal_xy = np.array([goal.x, goal.y], dtype=np.int64)
+        self.cell_type = np.zeros(self.n_cells, dtype=np.int8)
+        self.bit_index = np.full(self.n_cells, -1, dtype=np.int32)
+        for wall in walls:
+            if self.in_grid(wall.x, wall.y):
+                self.cell_type[self.cell_of(wall.x, wall.y)] |= CELL_WALL
+        for trap in traps:
+            if self.in_grid(trap.x, trap.y):
+                self.cell_type[self.cell_of(trap.x, trap.y)] |= CELL_TRAP
+        if self.in_grid(goal.x, goal.y):
+            self.cell_type[self.cell_of(goal.x, goal.y)] |= CELL_GOAL
+        # 같은 위치의 비트는 하나로, 맵 밖의 비트는 무시
+        bit_cells = []
+        for bit in bits:
+            if self.in_grid(bit.x, bit.y):
+                cell = self.cell_of(bit.x, bit.y)
+                if self.bit_index[cell] < 0:
+                    self.cell_type[cell] |= CELL_BIT
+                    self.bit_index[cell] = len(bit_cells)
+                    bit_cells.append(cell)
+        self.bit_cells = np.array(bit_cells, dtype=np.int64)
+        self.n_bits = len(bit_cells)
+
+        xs, ys = np.meshgrid(np.arange(x_min, x_max + 1), np.arange(y_min, y_max + 1))
+        self.cell_xy = np.stack([xs.ravel(), ys.ravel()], axis=1).astype(np.int64)
+
+        target = self.cell_xy[:, None, :] + ACTION_DELTAS[None, :, :]
+        inside = ((target[..., 0] >= x_min) & (target[..., 0] <= x_max)
+                  & (target[..., 1] >= y_min) & (target[..., 1] <= y_max))
+        target_cell = (np.clip(target[..., 1] - y_min, 0, self.height - 1) * self.width
+                       + np.clip(target[..., 0] - x_min, 0, self.width - 1))
+        blocked = ~inside | ((self.cell_type[target_cell] & CELL_WALL) != 0)
+        self.next_cell = np.where(blocked, np.arange(self.n_cells)[:, None], target_cell).astype(np.int32)
+
+    @classmethod
+    def from_config(cls, map_config: dict):
+        """MapConfig.model_dump() 형태의 dict로 컴파일합니다 (좌표 범위는 My2DEnv와 동일)."""
+        width, height = map_config["map_size"]
+        goal = map_config["exit_pos"]
+        return cls(
+            -(width // 2), width // 2, -(height // 2), height // 2,
+            walls=[GridPosition(p["x"], p["y"]) for p in map_config["wall_list"]],
+            traps=[GridPosition(p["x"], p["y"]) for p in map_config["trap_list"]],
+            bits=[GridPosition(p["x"], p["y"]) for p in map_config["bit_list"]],
+            goal=GridPosition(goal["x"], goal["y"]),
+        )
+
+    def in_grid(self, x, y):
+        return self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max
+
+    def cell_of(self, x, y):
+        return (y - self.y_min) * self.width + (x - self.x_min)
+
+
+class XYBitsEncoder:
+    """
+    기존 관측: [x, y] + 비트별 먹음 여부(obs_bits칸, 현재 칸의 비트 포함).
+    obs_bits보다 비트가 많은 맵은 표현할 수 없으므로 bind에서 거부합니다.
+    """
+    encoding = "xy_bits"
+    version = 1
+
+    def __init__(self, obs_bits: int = MAX_BITS):
+        self.obs_bits = obs_bits
+        self.state_dim = 2 + obs_bits
+
+    def spec(self):
+        return {"encoding": self.encoding, "version": self.version, "state_dim": self.state_dim,
+                "obs_bits": self.obs_bits}
+
+    def bind(self, compiled: CompiledMap):
+        """compiled 맵에 대해 encode(cells, collected) -> (K, state_dim) 함수를 만듭니다."""
+        if compiled.n_bits > self.obs_bits:
+            raise ValueError(f"Map has {compiled.n_bits} bits but the model observes at most {self.obs_bits}; "
+                             f"use a larger obs_bits or the local_view encoding")
+        cell_xy = compiled.cell_xy.astype(np.float32)
+        bit_index = compiled.bit_index.astype(np.int64)
+        slots = np.arange(compiled.n_bits)
+
+        def encode(cells, collected):
+            obs = np.zeros((len(cells), self.state_dim), dtype=np.float32)
+            obs[:, :2] = cell_xy[cells]
+            obs[:, 2:2 + len(slots)] = collected | (bit_index[cells][:, None] == slots[None, :])
+            return obs
+        return encode
+
+
+class LocalViewEncoder:
+    """
+    맵 크기/비트 수와 무관한 고정 크기 관측.
+    에이전트 중심 (2r+1)×(2r+1) 창의 채널 [막힘(벽/맵 밖), 함정, 출구, 남은 비트] + 전역 특징
+    [먹은 비트 비율, 출구 열림, 출구까지 (dx, dy), 가장 가까운 남은 비트까지 (dx, dy)] (거리는 맵 크기로 정규화).
+    """
+    encoding = "local_view"
+    version = 1
+    n_channels = 4
+    n_features = 6
+
+    def __init__(self, view_radius: int = 2):
+        self.view_radius = view_radius
+        self.window = (2 * view_radius + 1) ** 2
+        self.state_dim = self.n_channels * self.window + self.n_features
+
+    def spec(self):
+        return {"encoding": self.encoding, "version": self.version, "state_dim": self.state_dim,
+                "view_radius": self.view_radius}
+
+    def bind(self, compiled: CompiledMap):
+        r, w, h = self.view_radius, compiled.width, compiled.height
+        size = 2 * r + 1
+        # 맵 밖을 r칸 패딩한 격자에서 셀별 창의 평탄화 인덱스 (n_cells, window)
+        yi, xi = np.divmod(np.arange(compiled.n_cells), w)
+        dy, dx = np.meshgrid(np.arange(size), np.arange(size), indexing="ij")
+        window = (yi[:, None] + dy.ravel()[None, :]) * (w + 2 * r) + (xi[:, None] + dx.ravel()[None, :])
+
+        def padded(values, fill):
+            grid = np.full((h + 2 * r, w + 2 * r), fill, dtype=values.dtype)
+            grid[r:r + h, r:r + w] = values.reshape(h, w)
+            return grid.ravel()
+
+        static = np.stack([
+            padded((compiled.cell_type & CELL_WALL) != 0, True),
+            padded((compiled.cell_type & CELL_TRAP) != 0, False),
+            padded((compiled.cell_type & CELL_GOAL) != 0, False),
+        ]).astype(np.float32)
+        static_view = static[:, window].transpose(1, 0, 2).reshape(compiled.n_cells, 3 * self.window)
+        window_bits = padded(compiled.bit_index, -1)[window]
+        cell_xy = compiled.cell_xy.astype(np.float32)
+        bit_xy = cell_xy[compiled.bit_cells]
+        scale = np.array([w, h], dtype=np.float32)
+        n_bits = compiled.n_bits
+        static_end, bits_end = 3 * self.window, 4 * self.window
+
+        def encode(cells, collected):
+            k = len(cells)
+            obs = np.zeros((k, self.state_dim), dtype=np.float32)
+            obs[:, :static_end] = static_view[cells]
+            bits = window_bits[cells]
+            rows, cols = np.nonzero(bits >= 0)
+            obs[rows, static_end + cols] = ~collected[rows, bits[rows, cols]]
+            pos = cell_xy[cells]
+            n_collected = collected.sum(axis=1)
+            features = obs[:, bits_end:]
+            features[:, 0] = n_collected / max(n_bits, 1)
+            features[:, 1] = n_collected == n_bits
+            features[:, 2:4] = (compiled.goal_xy - pos) / scale
+            if n_bits:
+                dist = np.abs(bit_xy[None, :, :] - pos[:, None, :]).sum(axis=2)
+                dist[collected] = np.inf
+                nearest = dist.argmin(axis=1)
+                remaining = ~collected.all(axis=1)
+                features[remaining, 4:6] = (bit_xy[nearest[remaining]] - pos[remaining]) / scale
+            return obs
+        return encode
+
+
+class GridEncoder:
+    """
+    CNN용 관측: 채널 [벽, 함정, 남은 비트, 출구, 에이전트]의 grid_size×grid_size 격자를 (C, H, W) 순서로 평탄화한 벡터.
+    맵은 격자의 (0, 0) 모서리에 놓고 남는 칸은 벽으로 채우므로, grid_size 이하의 맵은 모두 같은 모양의 관측을 씁니다.
+    """
+    encoding = "grid"
+    version = 1
+    n_channels = 5
+
+    def __init__(self, grid_size: int = 16):
+        self.grid_size = grid_size
+        self.plane = grid_size * grid_size
+        self.state_dim = self.n_channels * self.plane
+
+    def spec(self):
+        return {"encoding": self.encoding, "version": self.version, "state_dim": self.state_dim,
+                "grid_size": self.grid_size}
+
+    def bind(self, compiled: CompiledMap):
+        g, plane = self.grid_size, self.plane
+        if compiled.width > g or compiled.height > g:
+            raise ValueError(f"Map is {compiled.width}x{compiled.height} but the model observes at most {g}x{g}")
+        yi, xi = np.divmod(np.arange(compiled.n_cells), compiled.width)
+        pos = yi * g + xi
+        base = np.zeros(self.state_dim, dtype=np.float32)
+        base[:plane] = 1.0
+        base[pos] = (compiled.cell_type & CELL_WALL) != 0
+        base[plane + pos] = (compiled.cell_type & CELL_TRAP) != 0
+        base[3 * plane + pos] = (compiled.cell_type & CELL_GOAL) != 0
+        bit_pos = 2 * plane + pos[compiled.bit_cells]
+        agent_pos = 4 * plane + pos
+
+        def encode(cells, collected):
+            obs = np.repeat(base[None, :], len(cells), axis=0)
+            rows, bits = np.nonzero(~collected)
+            obs[rows, bit_pos[bits]] = 1.0
+            obs[np.arange(len(cells)), agent_pos[cells]] = 1.0
+            return obs
+        return encode
+
+
+ObservationEncoding = Literal["xy_bits", "local_view", "grid"]
+
+
+def make_encoder(encoding: str = "xy_bits", obs_bits: int = MAX_BITS, view_radius: int = 2, grid_size: int = 16):
+    if encoding == "xy_bits":
+        return XYBitsEncoder(obs_bits)
+    if encoding == "local_view":
+        return LocalViewEncoder(view_radius)
+    if encoding == "grid":
+        return GridEncoder(grid_size)
+    raise ValueError(f"Unknown observation encoding {encoding}")
+
+
+# 렌더링용 셀 코드: 빈칸, 벽, 함정, 비트, 먹은 비트, 골, 에이전트 (뒤쪽이 우선)
+RENDER_SYMBOLS = np.array(['⬜', '⬛', '💀', '🔸', '✨', '🏁', '🤖'])
+RENDER_COLORS = np.array([
+    [255, 255, 255], [40, 40, 40], [200, 50, 50], [255, 160, 0],
+    [255, 230, 120], [60, 180, 75], [50, 100, 230],
+], dtype=np.uint8)
+RENDER_CELL_PIXELS = 16
+
+
+def render_frame(compiled: CompiledMap, cell: int, collected, mode: str, status: str = ''):
+    """
+    컴파일된 맵의 한 상태를 그립니다. collected는 비트별 먹음 여부(bool 배열)입니다.
+    mode='ansi'면 이모지 문자열, 'rgb_array'면 (H, W, 3) uint8 프레임을 반환합니다.
+    """
+    codes = np.zeros(compiled.n_cells, dtype=np.int64)
+    codes[(compiled.cell_type & CELL_WALL) != 0] = 1
+    codes[(compiled.cell_type & CELL_TRAP) != 0] = 2
+    has_bit = compiled.bit_index >= 0
+    taken = np.zeros(compiled.n_cells, dtype=bool)
+    taken[has_bit] = np.asarray(collected, dtype=bool)[compiled.bit_index[has_bit]]
+    codes[has_bit & ~taken] = 3
+    codes[has_bit & taken] = 4
+    codes[(compiled.cell_type & CELL_GOAL) != 0] = 5
+    codes[cell] = 6
+    # 위쪽(y가 큰 행)이 먼저 오도록 뒤집음
+    codes = codes.reshape(compiled.height, compiled.width)[::-1]
+
+    if mode == 'rgb_array':
+        frame = RENDER_COLORS[codes]
+        return frame.repeat(RENDER_CELL_PIXELS, axis=0).repeat(RENDER_CELL_PIXELS, axis=1)
+    rows = [' '.join(row) for row in RENDER_SYMBOLS[codes]]
+    if status:
+        rows.append(status)
+    return '\n'.join(rows)
+
+
 class My2DEnv(gym.Env):
-    metadata = {'render.modes': ['human']}
+    metadata = {'render_modes': ['human', 'ansi', 'rgb_array'], 'render_fps': 4}
 
     def __init__(self,
                  grid_size: Size = Size(9, 9),
@@ -39,8 +313,14 @@ class My2DEnv(gym.Env):
                  bits: List[GridPosition] = None,
                  goal: GridPosition = None,
                  agent_start=GridPosition(0, 0),
-                 max_steps=100):
+                 max_steps=100,
+                 render_mode: str = None,
+                 compiled: CompiledMap = None,
+                 encoder=None):
         super().__init__()
+        if render_mode is not None and render_mode not in self.metadata['render_modes']:
+            raise ValueError(f"Invalid render_mode {render_mode}")
+        self.render_mode = render_mode
         self.grid_size = grid_size
         self.success = 0
         self.x_min = -(grid_size.width // 2)
@@ -57,83 +337,109 @@ class My2DEnv(gym.Env):
         self.max_steps = max_steps
         self.current_step = 0
 
-        self.state = None
-        self.collected_bits = set()
-        self.max_bits = MAX_BITS
-
-        # 상태 공간: [x, y] + 각 비트의 먹음 여부(최대 MAX_BITS개)
-        self.observation_space = spaces.Box(
-            low=np.array([self.x_min, self.y_min] + [0]*self.max_bits, dtype=np.float32),
-            high=np.array([self.x_max, self.y_max] + [1]*self.max_bits, dtype=np.float32),
-            shape=(2 + self.max_bits,),
-            dtype=np.float32
-        )
+        self.cell = None
+        self.collected_mask = 0
+        self.n_collected = 0
+
+        # 같은 맵으로 이미 컴파일한 결과가 있으면 재사용 (CompiledMap은 읽기 전용)
+        self.compiled = compiled or CompiledMap(self.x_min, self.x_max, self.y_min, self.y_max,
+                                                self.walls, self.traps, self.bits, self.goal)
+        self.n_bits = self.compiled.n_bits
+        # 비트 보상 기준. 비트가 MAX_BITS개 이하인 맵은 예전과 같은 보상을 받음
+        self.max_bits = max(MAX_BITS, self.n_bits)
+        # 관측 인코더. 지정하지 않으면 맵의 비트 수에 맞춘 xy_bits
+        self.encoder = encoder or XYBitsEncoder(self.max_bits)
+        self._encode = self.encoder.bind(self.compiled)
+        self._fast_obs = isinstance(self.encoder, XYBitsEncoder)
+        # 스칼라 스텝에서는 NumPy 원소 접근보다 파이썬 리스트 조회가 빠르므로 리스트로 보관
+        self._next_cell = self.compiled.next_cell.tolist()
+        self._cell_type = self.compiled.cell_type.tolist()
+        self._bit_index = self.compiled.bit_index.tolist()
+        self._cell_xy = self.compiled.cell_xy.astype(np.float32)
+
+        # 상태 공간: 인코더가 정한 state_dim 크기의 벡터
+        if self._fast_obs:
+            # [x, y] + 각 비트의 먹음 여부(obs_bits개)
+            self.observation_space = spaces.Box(
+                low=np.array([self.x_min, self.y_min] + [0]*self.encoder.obs_bits, dtype=np.float32),
+                high=np.array([self.x_max, self.y_max] + [1]*self.encoder.obs_bits, dtype=np.float32),
+                shape=(self.encoder.state_dim,),
+                dtype=np.float32
+            )
+        else:
+            self.observation_space = spaces.Box(low=-1.0, high=1.0, shape=(self.encoder.state_dim,), dtype=np.float32)
 
         self.action_space = spaces.Discrete(4)
 
+    @property
+    def state(self):
+        if self.cell is None:
+            return None
+        return self._cell_xy[self.cell].copy()
+
+    @property
+    def collected_bits(self):
+        return {GridPosition(*self.compiled.cell_xy[cell]) for i, cell in enumerate(self.compiled.bit_cells.tolist())
+                if self.collected_mask >> i & 1}
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        self.state = np.array(self.agent_start.as_list(), dtype=np.float32)
+        if not self.compiled.in_grid(self.agent_start.x, self.agent_start.y):
+            raise ValueError("agent_start is outside of the grid")
+        self.cell = self.compiled.cell_of(self.agent_start.x, self.agent_start.y)
         self.current_step = 0
-        self.collected_bits = set()
+        self.collected_mask = 0
+        self.n_collected = 0
         return self._get_obs(), {}
 
     def _get_obs(self):
-        bit_flags = [0.0] * self.max_bits
-        agent_pos = GridPosition(int(self.state[0]), int(self.state[1]))
-        for i, bit in enumerate(self.bits):
-            if i < self.max_bits:
-                bit_flags[i] = 1.0 if bit in self.collected_bits or agent_pos == bit else 0.0
-        return np.array(list(self.state) + bit_flags, dtype=np.float32)
+        if not self._fast_obs:
+            collected = np.array([[self.collected_mask >> i & 1 for i in range(self.n_bits)]], dtype=bool)
+            return self._encode(np.array([self.cell]), collected.reshape(1, -1))[0]
+        obs = np.zeros(self.encoder.state_dim, dtype=np.float32)
+        obs[:2] = self._cell_xy[self.cell]
+        mask = self.collected_mask
+        i = 0
+        while mask:
+            if mask & 1:
+                obs[2 + i] = 1.0
+            mask >>= 1
+            i += 1
+        bit = self._bit_index[self.cell]
+        if bit >= 0:
+            obs[2 + bit] = 1.0
+        return obs
 
     def in_grid(self, x, y):
         return self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max
 
     def step(self, action):
-        x, y = self.state.astype(int)
-
-        # 이동 후보 위치 계산
-        if action == 0:    # 왼쪽
-            nx, ny = x - 1, y
-        elif action == 1:  # 오른쪽
-            nx, ny = x + 1, y
-        elif action == 2:  # 위
-            nx, ny = x, y + 1
-        elif action == 3:  # 아래
-            nx, ny = x, y - 1
-        else:
+        if not 0 <= action < 4:
             raise ValueError(f"Invalid action {action}")
 
+        cell = self._next_cell[self.cell][action]
         reward = -0.05
-        attempted_move_blocked = False
-
-        # 맵 범위 및 벽 충돌 검사
-        if self.in_grid(nx, ny):
-            if GridPosition(nx, ny) not in self.walls:
-                self.state = np.array([nx, ny], dtype=np.float32)
-            else:
-                attempted_move_blocked = True
-        else:
-            attempted_move_blocked = True
-
-        if attempted_move_blocked:
+        # 벽/범위 밖이면 제자리 (next_cell이 자기 자신)
+        if cell == self.cell:
             reward += -0.15
+        self.cell = cell
 
         self.current_step += 1
         terminated = False
-
-        agent_pos = GridPosition(int(self.state[0]), int(self.state[1]))
+        cell_type = self._cell_type[cell]
 
         # 비트 먹기
-        for i, bit in enumerate(self.bits):
-            if i < self.max_bits and agent_pos == bit and bit not in self.collected_bits:
-                self.collected_bits.add(bit)
+        if cell_type & CELL_BIT:
+            bit = 1 << self._bit_index[cell]
+            if not self.collected_mask & bit:
+                self.collected_mask |= bit
+                self.n_collected += 1
                 reward += 2.0
-                reward += (self.max_bits - len(self.collected_bits)) * 0.3
+                reward += (self.max_bits - self.n_collected) * 0.3
 
-        exit_open = len(self.collected_bits) == len(self.bits)
+        exit_open = self.n_collected == self.n_bits
 
-        if agent_pos == self.goal:
+        if cell_type & CELL_GOAL:
             if exit_open:
                 reward += 10.0
                 reward += max(0.0, (self.max_steps - self.current_step) * 0.1)
@@ -142,7 +448,7 @@ class My2DEnv(gym.Env):
             else:
                 reward += -1.0
 
-        if agent_pos in self.traps:
+        if cell_type & CELL_TRAP:
             reward += -5.0
             terminated = True
 
@@ -159,41 +465,160 @@ class My2DEnv(gym.Env):
             return None, None
         return xi, yi
 
-    def render(self, mode='human'):
-        grid = [['⬜' for _ in range(self.grid_size.width)] for _ in range(self.grid_size.height)]
-
-        for wall in self.walls:
-            xi, yi = self.pos_to_idx(wall)
-            if xi is not None and yi is not None:
-                grid[yi][xi] = '⬛'
-
-        for trap in self.traps:
-            xi, yi = self.pos_to_idx(trap)
-            if xi is not None and yi is not None:
-                grid[yi][xi] = '💀'
-
-        for i, bit in enumerate(self.bits):
-            if i < self.max_bits:
-                xi, yi = self.pos_to_idx(bit)
-                if xi is not None and yi is not None:
-                    if bit in self.collected_bits:
-                        grid[yi][xi] = '✨'
-                    else:
-                        grid[yi][xi] = '🔸'
-
-        xi, yi = self.pos_to_idx(self.goal)
-        if xi is not None and yi is not None:
-            grid[yi][xi] = '🏁'
-
-        x, y = self.state.astype(int)
-        xi, yi = self.pos_to_idx(GridPosition(x, y))
-        if xi is not None and yi is not None:
-            grid[yi][xi] = '🤖'
-
-        clear_output(wait=True)
-        for row in grid[::-1]:
-            print(' '.join(row), flush=True)
-        print(f"Step: {self.current_step} / {self.max_steps} | Success: {self.success} | Collected Bits: {len(self.collected_bits)} / {self.max_bits}", flush=True)
+    def render(self, mode=None):
+        """
+        render_mode에 따라 렌더링합니다. None이면 아무것도 하지 않고,
+        'ansi'는 문자열, 'rgb_array'는 NumPy 프레임을 반환하며 'human'은 표준 출력에 찍습니다.
+        """
+        mode = mode or self.render_mode
+        if mode is None or self.cell is None:
+            return None
+        collected = [bool(self.collected_mask >> i & 1) for i in range(self.n_bits)]
+        status = (f"Step: {self.current_step} / {self.max_steps} | Success: {self.success}"
+                  f" | Collected Bits: {self.n_collected} / {self.n_bits}")
+        frame = render_frame(self.compiled, self.cell, collected, 'rgb_array' if mode == 'rgb_array' else 'ansi', status)
+        if mode == 'human':
+            print(frame, flush=True)
+            return None
+        return frame
 
     def close(self):
-        pass
\ No newline at end of file
+        pass
+
+
+class VectorGridEnv:
+    """
+    같은 맵을 num_envs개 복제해 NumPy 배열로 한 번에 진행시키는 벡터 환경.
+    보상/종료 규칙은 My2DEnv.step과 동일하며, 끝난 환경은 자동으로 reset 됩니다.
+    """
+
+    def __init__(self, env: My2DEnv, num_envs: int = 1):
+        self.num_envs = num_envs
+        self.max_bits = env.max_bits
+        self.n_bits = env.n_bits
+        self.max_steps = env.max_steps
+        self.observation_space = env.observation_space
+        self.action_space = env.action_space
+        self.success = 0
+
+        compiled = env.compiled
+        self.next_cell = compiled.next_cell
+        self.cell_type = compiled.cell_type
+        self.bit_index = compiled.bit_index.astype(np.int64)
+        self.encoder = env.encoder
+        self._encode = env._encode
+        if not compiled.in_grid(env.agent_start.x, env.agent_start.y):
+            raise ValueError("agent_start is outside of the grid")
+        self.start = compiled.cell_of(env.agent_start.x, env.agent_start.y)
+
+        self.compiled = compiled
+        self.cells = np.full(num_envs, self.start, dtype=np.int64)
+        self.collected = np.zeros((num_envs, self.n_bits), dtype=bool)
+        self.current_step = np.zeros(num_envs, dtype=np.int64)
+        # 마지막 step 직후(자동 reset 이전)의 상태. render에서 끝난 에피소드의 마지막 장면을 그릴 때 사용
+        self.last_cells, self.last_collected, self.last_step = self.cells, self.collected, self.current_step
+
+    def _reset_envs(self, mask):
+        self.cells[mask] = self.start
+        self.collected[mask] = False
+        self.current_step[mask] = 0
+
+    def reset(self, seed=None):
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._get_obs()
+
+    def _get_obs(self):
+        return self._encode(self.cells, self.collected)
+
+    def step(self, actions):
+        """
+        모든 환경을 한 스텝 진행합니다.
+        반환되는 obs는 자동 reset이 적용된 값이고, 종료 직후의 관측은 info["final_observation"]에,
+        이번 스텝에 출구에 도달했는지는 info["success"]에 담깁니다.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        env_idx = np.arange(self.num_envs)
+        next_cells = self.next_cell[self.cells, actions]
+        blocked = next_cells == self.cells
+        self.cells = next_cells.astype(np.int64)
+
+        rewards = np.where(blocked, -0.2, -0.05)
+        self.current_step += 1
+
+        cell_type = self.cell_type[self.cells]
+        bit_index = self.bit_index[self.cells]
+        on_bit = bit_index >= 0
+        new_bit = np.zeros(self.num_envs, dtype=bool)
+        new_bit[on_bit] = ~self.collected[env_idx[on_bit], bit_index[on_bit]]
+        self.collected[env_idx[new_bit], bit_index[new_bit]] = True
+        n_collected = self.collected.sum(axis=1)
+        rewards += np.where(new_bit, 2.0 + (self.max_bits - n_collected) * 0.3, 0.0)
+
+        at_goal = (cell_type & CELL_GOAL) != 0
+        reached = at_goal & (n_collected == self.n_bits)
+        rewards += np.where(reached, 10.0 + np.maximum(0.0, (self.max_steps - self.current_step) * 0.1), 0.0)
+        rewards += np.where(at_goal & ~reached, -1.0, 0.0)
+        self.success += int(reached.sum())
+
+        on_trap = (cell_type & CELL_TRAP) != 0
+        rewards += np.where(on_trap, -5.0, 0.0)
+        terminated = reached | on_trap
+
+        truncated = self.current_step >= self.max_steps
+        rewards += np.where(truncated, -2.0, 0.0)
+
+        final_obs = self._get_obs()
+        done = terminated | truncated
+        self.last_cells, self.last_collected, self.last_step = self.cells, self.collected, self.current_step
+        if done.any():
+            self.last_cells, self.last_collected, self.last_step = (
+                self.cells.copy(), self.collected.copy(), self.current_step.copy()
+            )
+            self._reset_envs(done)
+            obs = self._get_obs()
+        else:
+            obs = final_obs
+        return obs, rewards, terminated, truncated, {"final_observation": final_obs, "success": reached}
+
+    def render(self, index: int = 0, mode: str = 'ansi'):
+        """index번 환경의 마지막 step 직후 상태를 그립니다(에피소드가 끝났다면 reset 이전 장면)."""
+        collected = self.last_collected[index]
+        status = (f"Step: {self.last_step[index]} / {self.max_steps} | Success: {self.success}"
+                  f" | Collected Bits: {int(collected.sum())} / {self.n_bits}")
+        return render_frame(self.compiled, int(self.last_cells[index]), collected, mode, status)
+
+
+class MultiMapVectorEnv:
+    """
+    여러 맵의 VectorGridEnv를 하나로 이어 붙인 벡터 환경. 한 모델을 여러 맵에서 같은 배치로 학습할 때 씁니다.
+    num_envs개의 환경을 맵마다 고르게 나누며(맵마다 최소 1개), 관측은 모든 맵이 같은 인코더로 만든 같은 크기여야 합니다.
+    """
+
+    def __init__(self, envs: List[My2DEnv], num_envs: int = 1):
+        if len({env.encoder.state_dim for env in envs}) != 1:
+            raise ValueError("All maps must produce observations of the same size")
+        n, m = max(num_envs, len(envs)), len(envs)
+        self.venvs = [VectorGridEnv(env, n // m + (i < n % m)) for i, env in enumerate(envs)]
+        self.offsets = np.cumsum([0] + [venv.num_envs for venv in self.venvs])
+        self.num_envs = int(self.offsets[-1])
+        self.max_steps = max(env.max_steps for env in envs)
+        self.observation_space = envs[0].observation_space
+        self.action_space = envs[0].action_space
+
+    @property
+    def success(self):
+        return sum(venv.success for venv in self.venvs)
+
+    def reset(self, seed=None):
+        return np.concatenate([venv.reset(seed) for venv in self.venvs])
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        results = [venv.step(actions[lo:hi]) for venv, lo, hi in zip(self.venvs, self.offsets[:-1], self.offsets[1:])]
+        obs, rewards, terminated, truncated, infos = zip(*results)
+        info = {key: np.concatenate([i[key] for i in infos]) for key in ("final_observation", "success")}
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(terminated), np.concatenate(truncated), info
+
+    def render(self, index: int = 0, mode: str = 'ansi'):
+        k = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        return self.venvs[k].render(index - int(self.offsets[k]), mode)
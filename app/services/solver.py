@@ -0,0 +1,171 @@
+from functools import cached_property
+
+import numpy as np
+
+from app.services.rl_environment import CompiledMap, CELL_GOAL, CELL_TRAP, MAX_BITS
+
+# 상태 수는 셀 수 × 2^비트 수로 늘어나므로 전이 표/가치 표가 이 크기를 넘는 맵은 풀지 않음
+MAX_SOLVER_STATES = 1 << 20
+MAX_SOLVER_VALUES = 1 << 25
+
+
+class MapTooLarge(ValueError):
+    """상태 공간이 너무 커서 정확한 해를 구하지 않는 맵."""
+
+
+class MapSolution:
+    """
+    맵의 전체 상태 그래프(셀 × 먹은 비트 마스크)에 대한 정확한 해. 최소 스텝 수(BFS)는 생성 시, 가치는 처음 필요할 때 계산합니다.
+    상태 번호는 state = cell * 2^n_bits + mask 이고, 보상/종료 규칙은 My2DEnv.step과 같습니다.
+    출구 도착 보너스와 시간 초과가 남은 스텝 수에 따라 달라지므로 가치는 스텝별로 계산합니다(유한 구간 가치 반복).
+    """
+
+    def __init__(self, compiled: CompiledMap, start_cell, max_steps: int, gamma: float = 1.0,
+                 max_states: int = MAX_SOLVER_STATES):
+        self.compiled = compiled
+        self.n_bits = compiled.n_bits
+        # My2DEnv.max_bits와 같은 비트 보상 기준
+        self.max_bits = max(MAX_BITS, self.n_bits)
+        self.max_steps = max_steps
+        self.gamma = gamma
+        self.n_masks = 1 << self.n_bits
+        self.n_states = compiled.n_cells * self.n_masks
+        if self.n_states > max_states:
+            raise MapTooLarge(f"Map has {self.n_states} states (limit {max_states})")
+        self.start_state = None if start_cell is None else start_cell * self.n_masks
+
+        self._build_transitions()
+        self.min_steps = self._shortest_path()
+        self.reachable = self.min_steps is not None
+        self.solvable = self.reachable and self.min_steps <= max_steps
+
+    def _build_transitions(self):
+        compiled = self.compiled
+        cells = np.repeat(np.arange(compiled.n_cells), self.n_masks)
+        masks = np.tile(np.arange(self.n_masks), compiled.n_cells)
+        popcount = np.zeros(self.n_masks, dtype=np.int64)
+        for i in range(self.n_bits):
+            popcount[1 << i:2 << i] = popcount[:1 << i] + 1
+
+        next_cells = compiled.next_cell[cells].astype(np.int64)                      # (S, 4)
+        bit = compiled.bit_index[next_cells].astype(np.int64)
+        bit_flag = np.where(bit >= 0, 1 << np.maximum(bit, 0), 0)
+        new_bit = (bit_flag != 0) & ((masks[:, None] & bit_flag) == 0)
+        next_masks = masks[:, None] | bit_flag
+        n_collected = popcount[next_masks]
+
+        cell_type = compiled.cell_type[next_cells]
+        at_goal = (cell_type & CELL_GOAL) != 0
+        on_trap = (cell_type & CELL_TRAP) != 0
+        # My2DEnv와 같이 맵의 비트를 모두 먹어야 출구가 열림
+        self.success = at_goal & (n_collected == self.n_bits)
+        self.terminal = self.success | on_trap
+        self.next_state = next_cells * self.n_masks + next_masks
+
+        reward = np.where(next_cells == cells[:, None], -0.2, -0.05)
+        reward += np.where(new_bit, 2.0 + (self.max_bits - n_collected) * 0.3, 0.0)
+        reward += np.where(self.success, 10.0, 0.0)
+        reward += np.where(at_goal & ~self.success, -1.0, 0.0)
+        reward += np.where(on_trap, -5.0, 0.0)
+        # 스텝에 따라 달라지는 출구 보너스와 시간 초과 벌점은 q_values에서 더함
+        self.base_reward = reward
+
+    def _shortest_path(self):
+        """시작 상태에서 모든 비트를 먹고 출구에 도착하기까지의 최소 스텝 수 (BFS). 불가능하면 None."""
+        if self.start_state is None:
+            return None
+        seen = np.zeros(self.n_states, dtype=bool)
+        seen[self.start_state] = True
+        frontier = np.array([self.start_state])
+        steps = 0
+        while len(frontier):
+            steps += 1
+            if self.success[frontier].any():
+                return steps
+            # 함정/출구 도착은 에피소드가 끝나므로 더 진행하지 않음
+            nxt = self.next_state[frontier][~self.terminal[frontier]]
+            nxt = np.unique(nxt[~seen[nxt]])
+            seen[nxt] = True
+            frontier = nxt
+        return None
+
+    def q_values(self, step: int, values_next=None):
+        """이미 step 스텝을 진행한 상태에서 각 행동의 최적 Q값 (S, 4)."""
+        t = step + 1
+        if values_next is None:
+            values_next = self.values[t]
+        q = self.base_reward + np.where(self.success, max(0.0, (self.max_steps - t) * 0.1), 0.0)
+        if t >= self.max_steps:
+            return q - 2.0
+        return q + np.where(self.terminal, 0.0, self.gamma * values_next[self.next_state])
+
+    @cached_property
+    def values(self):
+        """values[t, s]: t 스텝을 진행한 뒤 상태 s에서 얻을 수 있는 최대 (할인) 보상 합. 처음 쓸 때 계산합니다."""
+        if (self.max_steps + 1) * self.n_states > MAX_SOLVER_VALUES:
+            raise MapTooLarge(f"Value table of {(self.max_steps + 1) * self.n_states} entries "
+                              f"exceeds the limit {MAX_SOLVER_VALUES}")
+        values = np.zeros((self.max_steps + 1, self.n_states), dtype=np.float32)
+        for step in range(self.max_steps - 1, -1, -1):
+            values[step] = self.q_values(step, values[step + 1]).max(axis=1)
+        return values
+
+    @property
+    def optimal_return(self):
+        return None if self.start_state is None else float(self.values[0, self.start_state])
+
+    def policy(self, states, steps):
+        """상태 번호 배열과 진행한 스텝 수 배열에 대한 최적 행동."""
+        states = np.asarray(states)
+        steps = np.asarray(steps)
+        actions = np.zeros(len(states), dtype=np.int64)
+        for step in np.unique(steps):
+            rows = steps == step
+            actions[rows] = self.q_values(int(step))[states[rows]].argmax(axis=1)
+        return actions
+
+    def optimal_actions(self):
+        """시작 상태에서 최적 정책을 따라갈 때의 행동 목록."""
+        if self.start_state is None:
+            return []
+        actions, state = [], self.start_state
+        for step in range(self.max_steps):
+            action = int(self.q_values(step)[state].argmax())
+            actions.append(action)
+            if self.terminal[state, action]:
+                break
+            state = int(self.next_state[state, action])
+        return actions
+
+    def summary(self):
+        return {
+            "reachable": self.reachable,
+            "solvable": self.solvable,
+            "min_steps": self.min_steps,
+            "optimal_return": self.optimal_return,
+            "n_states": self.n_states,
+        }
+
+
+def solve_map(map_config: dict, compiled: CompiledMap = None, gamma: float = 1.0,
+              max_states: int = MAX_SOLVER_STATES):
+    """
+    MapConfig.model_dump() 형태의 dict로 맵을 풉니다. compiled가 있으면 다시 컴파일하지 않습니다.
+    상태 수가 max_states를 넘으면 전이 표를 만들기 전에 MapTooLarge를 던집니다.
+    """
+    compiled = compiled or CompiledMap.from_config(map_config)
+    start = map_config["agent_pos"]
+    start_cell = compiled.cell_of(start["x"], start["y"]) if compiled.in_grid(start["x"], start["y"]) else None
+    return MapSolution(compiled, start_cell, map_config["max_steps"], gamma=gamma, max_states=max_states)
+
+
+class TabularAgent:
+    """MapSolution의 최적 정책으로 행동하는 에이전트. DQN 성능을 비교하는 기준선으로 사용합니다."""
+
+    def __init__(self, solution: MapSolution):
+        self.solution = solution
+
+    def select_actions(self, cells, collected, steps):
+        """VectorGridEnv의 cells, collected (K, n_bits), current_step으로 행동을 고릅니다."""
+        masks = (np.asarray(collected, dtype=np.int64) << np.arange(collected.shape[1])).sum(axis=1)
+        return self.solution.policy(np.asarray(cells) * self.solution.n_masks + masks, steps)
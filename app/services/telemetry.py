@@ -0,0 +1,54 @@
+import time
+from typing import Literal
+
+# every_step: 스텝마다 "step" 이벤트 (기존 동작)
+# every_n_steps: n개 스텝 기록을 하나의 "steps" 프레임으로 묶어 전송
+# interval: hz 주기로 그동안 쌓인 스텝 기록을 "steps" 프레임으로 전송
+# per_episode_summary: 스텝 기록 없이 에피소드 요약("episode")만 전송
+TelemetryMode = Literal["every_step", "every_n_steps", "interval", "per_episode_summary"]
+
+
+class Telemetry:
+    """학습 스텝/에피소드 기록을 telemetry 모드에 맞게 묶어서 EventStream으로 내보냅니다."""
+
+    def __init__(self, events, mode: TelemetryMode = "every_step", every_n: int = 100, hz: float = 10.0,
+                 render_every: int = 0):
+        self.events = events
+        self.mode = mode
+        # render_every 에피소드마다 마지막 장면을 "render" 이벤트로 전송 (0이면 렌더링 안 함)
+        self.render_every = render_every
+        self.every_n = max(1, every_n)
+        self.period = 1.0 / hz if hz > 0 else 0.0
+        # 스텝 기록이 필요 없는 모드에서는 호출 측이 기록 dict를 만들지 않도록 알려줌
+        self.wants_steps = mode != "per_episode_summary"
+        self._records = []
+        self._last_flush = time.monotonic()
+
+    def step(self, record: dict):
+        if self.mode == "every_step":
+            self.events.emit({"event": "step", **record})
+            return
+        self._records.append(record)
+        if self.mode == "every_n_steps":
+            if len(self._records) >= self.every_n:
+                self.flush()
+        elif time.monotonic() - self._last_flush >= self.period:
+            self.flush()
+
+    def episode(self, summary: dict):
+        if self.mode == "per_episode_summary":
+            self.events.emit({"event": "episode", **summary})
+
+    def wants_render(self, episode: int):
+        return self.render_every > 0 and episode % self.render_every == 0
+
+    def event(self, event: dict):
+        """에피소드 성공/저장 같은 일반 이벤트. 순서가 뒤바뀌지 않도록 쌓인 스텝 기록을 먼저 내보냅니다."""
+        self.flush()
+        self.events.emit(event)
+
+    def flush(self):
+        if self._records:
+            self.events.emit({"event": "steps", "records": self._records})
+            self._records = []
+        self._last_flush = time.monotonic()
@@ -0,0 +1,258 @@
+import time
+
+import numpy as np
+import torch
+
+from app.services.cache import get_checkpoint, get_compiled_map, put_checkpoint
+from app.services.checkpoint import CheckpointWriter, load_replay, snapshot_agent
+from app.services.dqn_agent import DQNAgent
+from app.services.rl_environment import (
+    My2DEnv, Size, GridPosition, VectorGridEnv, MultiMapVectorEnv, XYBitsEncoder, make_encoder,
+)
+from app.services.telemetry import Telemetry
+
+
+class EventStream:
+    """
+    워커 프로세스에서 발생한 이벤트를 모아서 큐에 전달합니다.
+    이벤트마다 IPC 왕복이 생기지 않도록 flush_interval 또는 max_pending 단위로 묶어서 보냅니다.
+    """
+
+    def __init__(self, queue, flush_interval=0.05, max_pending=256):
+        self.queue = queue
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def emit(self, event):
+        self._pending.append(event)
+        if len(self._pending) >= self.max_pending or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.queue.put(self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+
+def build_encoder(model_config: dict):
+    """ModelSchema.model_dump() 형태의 dict로 모델의 관측 인코더를 생성합니다."""
+    return make_encoder(model_config["obs_encoding"], model_config["obs_bits"], model_config["view_radius"],
+                        model_config["grid_size"])
+
+
+def check_observation(checkpoint_state: dict, encoder):
+    """체크포인트가 저장될 때의 관측 인코딩이 지금 인코더와 다르면 ValueError. 예전 체크포인트는 xy_bits(3비트)로 봅니다."""
+    saved = checkpoint_state.get("observation") or XYBitsEncoder().spec()
+    if saved != encoder.spec():
+        raise ValueError(f"Checkpoint was trained with observation {saved}, model is configured for {encoder.spec()}")
+
+
+def build_env(map_config: dict, encoder=None):
+    """MapSchema.model_dump() 형태의 dict로 My2DEnv를 생성합니다. encoder가 없으면 맵에 맞춘 xy_bits 관측을 씁니다."""
+    return My2DEnv(
+        grid_size=Size(map_config["map_size"][0], map_config["map_size"][1]),
+        walls=[GridPosition(wall["x"], wall["y"]) for wall in map_config["wall_list"]],
+        traps=[GridPosition(trap["x"], trap["y"]) for trap in map_config["trap_list"]],
+        bits=[GridPosition(bit["x"], bit["y"]) for bit in map_config["bit_list"]],
+        goal=GridPosition(map_config["exit_pos"]["x"], map_config["exit_pos"]["y"]),
+        agent_start=GridPosition(map_config["agent_pos"]["x"], map_config["agent_pos"]["y"]),
+        max_steps=map_config["max_steps"],
+        compiled=get_compiled_map(map_config),
+        encoder=encoder,
+    )
+
+
+def build_agent(model_config: dict, env: My2DEnv, device: str):
+    """ModelSchema.model_dump() 형태의 dict로 DQNAgent를 생성합니다."""
+    return DQNAgent(
+        action_dim=env.action_space.n,
+        state_dim=env.encoder.state_dim,
+        device=device,
+        learning_rate=model_config["learning_rate"],
+        batch_size=model_config["batch_size"],
+        gamma=model_config["gamma"],
+        epsilon_start=model_config["epsilon_start"],
+        epsilon_min=model_config["epsilon_min"],
+        epsilon_decay=model_config["epsilon_decay"],
+        update_target_every=model_config["update_target_every"],
+        replay_capacity=model_config["replay_capacity"],
+        replay_type=model_config["replay_type"],
+        priority_alpha=model_config["priority_alpha"],
+        priority_beta=model_config["priority_beta"],
+        train_every=model_config["train_every"],
+        gradient_steps=model_config["gradient_steps"],
+        learning_starts=model_config["learning_starts"],
+        model_type=model_config["model_type"],
+        grid_size=model_config["grid_size"],
+    )
+
+
+def run_training(map_config: dict, model_config: dict, queue, stop_event, loop: bool = False,
+                 telemetry: dict = None, device: str = None, limits: dict = None, checkpoint: dict = None,
+                 extra_map_configs: list = None):
+    """
+    학습 워커 프로세스의 진입점입니다.
+    My2DEnv/DQNAgent를 직접 소유하고, 진행 상황은 queue로 이벤트 리스트를 보내 전달합니다.
+    model_config["num_envs"]개의 환경을 VectorGridEnv로 동시에 진행하며 행동 선택도 한 번에 배치로 수행합니다.
+    loop=False면 첫 성공 에피소드에서 저장 후 종료하고, loop=True면 stop_event가 설정될 때까지 학습합니다.
+    telemetry는 Telemetry 생성 인자(mode, every_n, hz, render_every)입니다.
+    limits의 max_episodes/max_successes/max_seconds 중 하나라도 도달하면 학습을 멈춥니다.
+    체크포인트는 CheckpointWriter(checkpoint = min_interval, keep)가 백그라운드에서 저장합니다.
+    extra_map_configs가 있으면 map_config와 함께 MultiMapVectorEnv로 묶어 한 배치에서 여러 맵을 학습합니다.
+    """
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    limits = limits or {}
+    max_episodes = limits.get("max_episodes")
+    max_successes = limits.get("max_successes")
+    max_seconds = limits.get("max_seconds")
+    events = EventStream(queue)
+    telemetry = Telemetry(events, **(telemetry or {}))
+
+    encoder = build_encoder(model_config)
+    env = build_env(map_config, encoder)
+    agent = build_agent(model_config, env, device)
+
+    # 이전 세션의 옵티마이저/epsilon/리플레이까지 복원해 워밍업 없이 이어서 학습
+    model_path = model_config["model_url"]
+    save_replay = model_config["save_replay"]
+    total_episodes = 0
+    checkpoint_state = get_checkpoint(model_config["model_id"], model_path) if model_path else None
+    if checkpoint_state is not None:
+        check_observation(checkpoint_state, encoder)
+        agent.load_training_state(checkpoint_state)
+        total_episodes = checkpoint_state.get("counters", {}).get("total_episodes", 0)
+        replay = load_replay(model_path) if save_replay else None
+        if replay is not None:
+            agent.memory.load_state_dict(replay)
+        events.emit({"event": "model_loaded", "model_url": model_path, "epsilon": agent.epsilon,
+                     "total_episodes": total_episodes, "replay_size": len(agent.memory)})
+    else:
+        events.emit({"event": "model_created"})
+
+    writer = CheckpointWriter(model_path, **(checkpoint or {}),
+                              on_saved=lambda snapshot: put_checkpoint(model_config["model_id"], model_path, snapshot))
+    if extra_map_configs:
+        envs = [env] + [build_env(config, encoder) for config in extra_map_configs]
+        venv = MultiMapVectorEnv(envs, model_config["num_envs"])
+    else:
+        venv = VectorGridEnv(env, model_config["num_envs"])
+    num_envs = venv.num_envs
+    # 환경별 진행 중인 에피소드 번호/누적 보상/스텝 수
+    episode_ids = np.arange(num_envs)
+    next_episode = num_envs
+    total_rewards = np.zeros(num_envs)
+    steps = np.zeros(num_envs, dtype=np.int64)
+    episode = 0
+    completed = 0
+    finished = False
+    reason = "stopped"
+    iteration = 0
+    start = time.time()
+
+    def make_snapshot():
+        return snapshot_agent(agent, include_replay=save_replay, observation=encoder.spec(),
+                              episodes=completed, success=venv.success,
+                              total_episodes=total_episodes + completed)
+
+    def emit_saved():
+        # writer 스레드가 실제로 저장을 마친 버전만 알림 (대기 중에 교체된 스냅샷은 저장되지 않음)
+        for version in writer.saved_versions():
+            telemetry.event({"event": "model_saved", "model_url": model_path, "version": version})
+
+    try:
+        states = venv.reset()
+        while not finished:
+            # stop_event 조회는 IPC 왕복이므로 주기적으로만 확인
+            if iteration % 100 == 0:
+                emit_saved()
+                if stop_event.is_set():
+                    break
+                if max_seconds is not None and time.time() - start >= max_seconds:
+                    reason = "max_seconds"
+                    break
+            iteration += 1
+            actions = agent.select_actions(states)
+            next_states, rewards, terminated, truncated, info = venv.step(actions)
+            final_states = info["final_observation"]
+            # 비트가 많은 맵은 시간 초과 스텝에도 보상이 1 이상일 수 있으므로 성공은 보상 크기가 아닌 출구 도착으로 판단
+            reached = info["success"]
+            dones = terminated | truncated
+            agent.store_batch(states, actions, rewards, final_states, dones)
+            loss = agent.maybe_train()
+            agent.update_epsilon()
+            states = next_states
+            total_rewards += rewards
+            steps += 1
+
+            # 스텝 기록은 0번 환경 기준
+            if telemetry.wants_steps:
+                telemetry.step({
+                    "episode": int(episode_ids[0]),
+                    "step": int(steps[0]),
+                    "state": final_states[0].tolist(),
+                    "action": int(actions[0]),
+                    "reward": float(rewards[0]),
+                    "total_reward": float(total_rewards[0]),
+                    "loss": loss,
+                    "epsilon": agent.epsilon,
+                    "terminated": bool(terminated[0]),
+                    "truncated": bool(truncated[0]),
+                    "success": venv.success
+                })
+
+            for i in np.flatnonzero(dones):
+                episode = int(episode_ids[i])
+                completed += 1
+                if episode % agent.update_target_every == 0:
+                    agent.update_target_network()
+
+                if telemetry.wants_render(episode):
+                    telemetry.event({"event": "render", "episode": episode, "frame": venv.render(i)})
+
+                telemetry.episode({
+                    "episode": episode,
+                    "steps": int(steps[i]),
+                    "total_reward": float(total_rewards[i]),
+                    "terminated": bool(terminated[i]),
+                    "truncated": bool(truncated[i]),
+                    "loss": loss,
+                    "epsilon": agent.epsilon,
+                    "success": venv.success
+                })
+
+                if reached[i]:
+                    telemetry.event({"event": "episode_success", "episode": episode, "total_reward": float(total_rewards[i])})
+                    if not loop:
+                        finished = True
+                        reason = "success"
+                        break
+                    # 주기 제한/최고 기록 갱신 여부는 writer가 판단, 실제 쓰기는 백그라운드에서 진행
+                    writer.request(make_snapshot, score=float(total_rewards[i]))
+
+                episode_ids[i] = next_episode
+                next_episode += 1
+                total_rewards[i] = 0
+                steps[i] = 0
+
+                if max_episodes is not None and completed >= max_episodes:
+                    finished, reason = True, "max_episodes"
+                    break
+                if max_successes is not None and venv.success >= max_successes:
+                    finished, reason = True, "max_successes"
+                    break
+
+        if reason == "success":
+            writer.request(make_snapshot, force=True)
+            print(f"Training completed in {time.time() - start:.2f} seconds, total episodes: {episode + 1}", flush=True)
+    finally:
+        # 주기 제한으로 건너뛴 저장이 있으면 마지막 상태를 한 번 저장하고, 대기 중인 쓰기가 끝날 때까지 기다림
+        if writer.dirty:
+            writer.request(make_snapshot, force=True)
+        writer.close()
+        emit_saved()
+        telemetry.flush()
+        events.flush()
+    return {"episodes": completed, "success": venv.success, "reason": reason}
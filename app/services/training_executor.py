@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+import queue as queue_lib
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import settings
+from app.services.trainer import run_training
+
+
+class TrainingSession:
+    """실행 중인 학습 한 건. 워커가 보내는 이벤트를 비동기로 읽고 중단 신호를 보낼 수 있습니다."""
+
+    def __init__(self, future, queue, stop_event):
+        self.future = future
+        self.queue = queue
+        self.stop_event = stop_event
+
+    async def events(self, poll_timeout=0.5):
+        """워커가 끝날 때까지 이벤트를 하나씩 yield 합니다. 큐 대기는 스레드에서 하므로 이벤트 루프를 막지 않습니다."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = await loop.run_in_executor(None, self.queue.get, True, poll_timeout)
+            except queue_lib.Empty:
+                if self.future.done():
+                    break
+                continue
+            for event in batch:
+                yield event
+
+        # 워커 종료 직전에 들어온 이벤트까지 모두 전달
+        while True:
+            try:
+                batch = self.queue.get_nowait()
+            except queue_lib.Empty:
+                break
+            for event in batch:
+                yield event
+
+        if self.future.cancelled():
+            return
+        error = self.future.exception()
+        if error is not None:
+            yield {"event": "error", "detail": str(error)}
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class TrainingExecutor:
+    """
+    학습을 별도 프로세스 풀에서 실행하는 실행기.
+    워커 프로세스가 My2DEnv/DQNAgent를 소유하므로 학습 중에도 API 이벤트 루프가 막히지 않습니다.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = None
+        self._manager = None
+
+    def start(self):
+        if self._pool is not None:
+            return
+        # CUDA는 fork 이후 재초기화가 불가능하므로 spawn 사용
+        ctx = multiprocessing.get_context("spawn")
+        self._manager = ctx.Manager()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def submit(self, map_config: dict, model_config: dict, loop: bool = False, telemetry: dict = None,
+               device: str = None, limits: dict = None, checkpoint: dict = None, extra_map_configs: list = None):
+        self.start()
+        queue = self._manager.Queue()
+        stop_event = self._manager.Event()
+        future = self._pool.submit(run_training, map_config, model_config, queue, stop_event, loop, telemetry,
+                                   device, limits, checkpoint, extra_map_configs)
+        return TrainingSession(asyncio.wrap_future(future), queue, stop_event)
+
+
+training_executor = TrainingExecutor(settings.TRAINING_WORKERS)
@@ -0,0 +1,115 @@
+"""
+My2DEnv.step 마이크로벤치마크.
+
+ListScanEnv는 맵 컴파일 이전의 스텝 구현(벽/함정 리스트 순회, 매 스텝 GridPosition 생성)을 그대로 재현한 기준선입니다.
+9x9, 64x64 맵에서 기준선 / 컴파일된 My2DEnv / VectorGridEnv의 초당 스텝 수를 비교합니다.
+
+    python -m benchmarks.bench_env_step
+"""
+import time
+
+import numpy as np
+
+from app.services.rl_environment import My2DEnv, VectorGridEnv, Size, GridPosition
+
+
+class ListScanEnv(My2DEnv):
+    """컴파일 이전 구현: 리스트 순회 기반 충돌/함정 검사."""
+
+    def reset(self, seed=None, options=None):
+        self._pos = np.array(self.agent_start.as_list(), dtype=np.float32)
+        self.current_step = 0
+        self._collected = set()
+        return self._legacy_obs(), {}
+
+    def _legacy_obs(self):
+        bit_flags = [0.0] * self.max_bits
+        agent_pos = GridPosition(int(self._pos[0]), int(self._pos[1]))
+        for i, bit in enumerate(self.bits):
+            if i < self.max_bits:
+                bit_flags[i] = 1.0 if bit in self._collected or agent_pos == bit else 0.0
+        return np.array(list(self._pos) + bit_flags, dtype=np.float32)
+
+    def step(self, action):
+        x, y = self._pos.astype(int)
+        nx, ny = [(x - 1, y), (x + 1, y), (x, y + 1), (x, y - 1)][action]
+        reward = -0.05
+        if self.in_grid(nx, ny) and GridPosition(nx, ny) not in self.walls:
+            self._pos = np.array([nx, ny], dtype=np.float32)
+        else:
+            reward += -0.15
+        self.current_step += 1
+        terminated = False
+        agent_pos = GridPosition(int(self._pos[0]), int(self._pos[1]))
+        for i, bit in enumerate(self.bits):
+            if i < self.max_bits and agent_pos == bit and bit not in self._collected:
+                self._collected.add(bit)
+                reward += 2.0 + (self.max_bits - len(self._collected)) * 0.3
+        if agent_pos == self.goal:
+            if len(self._collected) == len(self.bits):
+                reward += 10.0 + max(0.0, (self.max_steps - self.current_step) * 0.1)
+                terminated = True
+            else:
+                reward += -1.0
+        if agent_pos in self.traps:
+            reward += -5.0
+            terminated = True
+        truncated = self.current_step >= self.max_steps
+        if truncated:
+            reward += -2.0
+        return self._legacy_obs(), reward, terminated, truncated, {}
+
+
+def make_map(size, seed=0):
+    """벽 20%, 함정 5%, 비트 3개가 무작위로 놓인 size x size 맵 인자를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    half = size // 2
+    cells = [GridPosition(x, y) for x in range(-half, half + 1) for y in range(-half, half + 1)]
+    order = rng.permutation(len(cells))
+    cells = [cells[i] for i in order]
+    n_walls, n_traps = len(cells) // 5, len(cells) // 20
+    return dict(
+        grid_size=Size(size, size),
+        walls=cells[:n_walls],
+        traps=cells[n_walls:n_walls + n_traps],
+        bits=cells[n_walls + n_traps:n_walls + n_traps + 3],
+        goal=cells[n_walls + n_traps + 3],
+        agent_start=cells[n_walls + n_traps + 4],
+        max_steps=200,
+    )
+
+
+def bench_single(env_cls, kwargs, n_steps):
+    env = env_cls(**kwargs)
+    actions = np.random.default_rng(1).integers(0, 4, size=n_steps).tolist()
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+
+def bench_vector(kwargs, n_steps, num_envs):
+    venv = VectorGridEnv(My2DEnv(**kwargs), num_envs)
+    actions = np.random.default_rng(1).integers(0, 4, size=(n_steps // num_envs, num_envs))
+    venv.reset()
+    start = time.perf_counter()
+    for batch in actions:
+        venv.step(batch)
+    return actions.size / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'map':>7} | {'list scan':>12} | {'compiled':>12} | {'speedup':>7} | {'vector x64':>12}")
+    for size, n_steps in ((9, 50_000), (64, 5_000)):
+        kwargs = make_map(size)
+        before = bench_single(ListScanEnv, kwargs, n_steps)
+        after = bench_single(My2DEnv, kwargs, n_steps)
+        vector = bench_vector(kwargs, 200_000, 64)
+        print(f"{size:>3}x{size:<3} | {before:>10,.0f}/s | {after:>10,.0f}/s | {after / before:>6.1f}x | {vector:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
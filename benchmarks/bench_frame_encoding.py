@@ -0,0 +1,59 @@
+"""
+학습 스텝 스트림 인코딩 벤치마크: JSON("steps" 프레임) vs 바이너리 프레임.
+1000 스텝 배치 기준으로 스텝당 바이트 수와 인코딩 CPU 시간을 비교합니다.
+
+    python -m benchmarks.bench_frame_encoding
+"""
+import json
+import time
+
+import numpy as np
+
+from app.services.frame_codec import encode_step_frame
+from frame_decoder import decode_frame, to_records
+
+
+def make_records(n, state_dim=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        "episode": i // 50,
+        "step": i % 50 + 1,
+        "state": rng.integers(-4, 5, size=state_dim).astype(np.float32).tolist(),
+        "action": int(rng.integers(4)),
+        "reward": float(rng.normal()),
+        "total_reward": float(rng.normal() * 10),
+        "loss": float(rng.random()) if i % 7 else None,
+        "epsilon": float(rng.random()),
+        "terminated": bool(i % 50 == 49),
+        "truncated": False,
+        "success": i // 100,
+    } for i in range(n)]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(n=1000, repeat=200):
+    records = make_records(n)
+    # starlette의 send_json과 같은 옵션
+    payload, json_time = timed(
+        lambda: json.dumps({"event": "steps", "records": records}, separators=(",", ":"), ensure_ascii=False),
+        repeat)
+    frame, binary_time = timed(lambda: encode_step_frame(records), repeat)
+
+    decoded = to_records(decode_frame(frame))
+    assert [r["step"] for r in decoded] == [r["step"] for r in records]
+
+    json_bytes = len(payload.encode())
+    print(f"{n} steps per frame")
+    print(f"json  : {json_bytes / n:7.1f} bytes/step  {json_time / n * 1e6:6.2f} us/step")
+    print(f"binary: {len(frame) / n:7.1f} bytes/step  {binary_time / n * 1e6:6.2f} us/step")
+    print(f"ratio : {json_bytes / len(frame):7.1f}x smaller   {json_time / binary_time:6.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
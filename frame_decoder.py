@@ -0,0 +1,60 @@
+import struct
+
+import numpy as np
+
+# app/services/frame_codec.py 의 바이너리 스텝 프레임 디코더 (클라이언트용, numpy만 필요)
+FRAME_MAGIC = b"YTS1"
+FRAME_HEADER = struct.Struct("<4sHHI")
+
+
+def decode_frame(data: bytes) -> dict:
+    """바이너리 프레임을 필드별 NumPy 배열 dict로 디코딩합니다."""
+    magic, version, state_dim, count = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Unknown frame magic {magic!r}")
+    if version != 1:
+        raise ValueError(f"Unsupported frame version {version}")
+
+    offset = FRAME_HEADER.size
+    floats = np.frombuffer(data, dtype="<f4", count=4 * count, offset=offset).reshape(4, count)
+    offset += floats.nbytes
+    states = np.frombuffer(data, dtype="<f4", count=count * state_dim, offset=offset).reshape(count, state_dim)
+    offset += states.nbytes
+    ints = np.frombuffer(data, dtype="<u4", count=3 * count, offset=offset).reshape(3, count)
+    offset += ints.nbytes
+    bytes_ = np.frombuffer(data, dtype=np.uint8, count=2 * count, offset=offset).reshape(2, count)
+
+    return {
+        "reward": floats[0],
+        "total_reward": floats[1],
+        "loss": floats[2],
+        "epsilon": floats[3],
+        "state": states,
+        "episode": ints[0],
+        "step": ints[1],
+        "success": ints[2],
+        "action": bytes_[0],
+        "terminated": (bytes_[1] & 1).astype(bool),
+        "truncated": (bytes_[1] & 2).astype(bool),
+    }
+
+
+def to_records(frame: dict) -> list:
+    """decode_frame 결과를 JSON 스텝 이벤트와 같은 형태의 dict 리스트로 변환합니다."""
+    records = []
+    for i in range(len(frame["step"])):
+        loss = float(frame["loss"][i])
+        records.append({
+            "episode": int(frame["episode"][i]),
+            "step": int(frame["step"][i]),
+            "state": frame["state"][i].tolist(),
+            "action": int(frame["action"][i]),
+            "reward": float(frame["reward"][i]),
+            "total_reward": float(frame["total_reward"][i]),
+            "loss": None if np.isnan(loss) else loss,
+            "epsilon": float(frame["epsilon"][i]),
+            "terminated": bool(frame["terminated"][i]),
+            "truncated": bool(frame["truncated"][i]),
+            "success": int(frame["success"][i]),
+        })
+    return records
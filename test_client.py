@@ -3,6 +3,8 @@ import asyncio
 import os
 from dotenv import load_dotenv
 
+from frame_decoder import decode_frame, to_records
+
 load_dotenv()
 async def test():
     test_websocket_path = os.getenv('TEST_WEBSOCKET_PATH')
@@ -13,7 +15,12 @@ async def test():
             try:
                 await websocket.send("start")
                 async for message in websocket:
-                    print(message)
+                    # ?encoding=binary로 접속하면 스텝 기록은 바이너리 프레임으로 옴
+                    if isinstance(message, bytes):
+                        for record in to_records(decode_frame(message)):
+                            print(record)
+                    else:
+                        print(message)
 
             except websockets.exceptions.ConnectionClosedOK:
                 print("서버가 정상적으로 연결을 종료했습니다.")
@@ -14,7 +14,8 @@ async def train_maps(map_ids, test_websocket_path, test_model, stage_name):
     """
     need_retrain = False
     for map_id in map_ids:
-        url = f"{test_websocket_path}/{test_model}/{map_id}/loop"
+        # 진행 상황(episode, success)만 필요하므로 에피소드 요약만 구독
+        url = f"{test_websocket_path}/{test_model}/{map_id}/loop?telemetry=per_episode_summary"
         print(f"[{stage_name}] Connecting to {url} ...")
         try:
             async with websockets.connect(url) as websocket: